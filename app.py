@@ -1,15 +1,43 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, Response
+from flask import Flask, render_template, request, redirect, url_for, session, flash, Response, send_from_directory
 
 from dotenv import load_dotenv
+from markupsafe import escape
+import click
 import requests
 import uuid
 
+import csv
+import difflib
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
 import os
+import socket
 import sqlite3
-from datetime import datetime
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Galleries fall back to the original files without Pillow.
+    Image = ImageOps = None
+
+try:
+    import brotli
+except ImportError:  # Only gzip variants are built without brotli.
+    brotli = None
+
 # ---------------- APP SETUP ----------------
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,46 +47,355 @@ app.secret_key = os.getenv("FLASK_SECRET_KEY", "CHANGE_THIS_SECRET_KEY")
 
 HOME_FOLDER = os.path.join(BASE_DIR, "static", "images", "home")
 DESIGN_FOLDER = os.path.join(BASE_DIR, "static", "images", "designs")
-CUSTOMER_FOLDER = os.path.join(BASE_DIR, "static", "images", "customer_uploads")
-EMPLOYEE_FOLDER = os.path.join(BASE_DIR, "static", "employee_docs")
-
-SQLITE_DB = os.path.join(BASE_DIR, "if_fashion.db")
+CUSTOMER_FOLDER = os.getenv("CUSTOMER_FOLDER", os.path.join(BASE_DIR, "static", "images", "customer_uploads"))
+EMPLOYEE_FOLDER = os.getenv("EMPLOYEE_FOLDER", os.path.join(BASE_DIR, "static", "employee_docs"))
+
+SQLITE_DB = os.getenv("SQLITE_DB", os.path.join(BASE_DIR, "if_fashion.db"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+DB_FETCH_ARRAYSIZE = int(os.getenv("DB_FETCH_ARRAYSIZE", "500"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+ADMIN_PAGE_SIZES = {
+    "cust": int(os.getenv("ADMIN_CUSTOMER_PAGE_SIZE", "25")),
+    "emp": int(os.getenv("ADMIN_EMPLOYEE_PAGE_SIZE", "25")),
+}
+ADMIN_MAX_PAGE_SIZE = 200
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "20"))
+SEARCH_MAX_LIMIT = 100
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "1000"))
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+TRACK_ID_ATTEMPTS = int(os.getenv("TRACK_ID_ATTEMPTS", "5"))
+# Per-worker cache of /track results; admin edits invalidate it in the worker
+# that made them, the TTL bounds staleness in the others.
+TRACK_CACHE_SIZE = int(os.getenv("TRACK_CACHE_SIZE", "1000"))
+TRACK_CACHE_TTL = int(os.getenv("TRACK_CACHE_TTL", "30"))
+CHAT_LONG_POLL_SECONDS = int(os.getenv("CHAT_LONG_POLL_SECONDS", "25"))
+CHAT_LONG_POLL_RECHECK = float(os.getenv("CHAT_LONG_POLL_RECHECK", "5"))
+# Every parked long-poll holds a request thread; keep this well below the
+# gunicorn --threads count so waiters can never starve ordinary requests.
+CHAT_LONG_POLL_WAITERS = int(os.getenv("CHAT_LONG_POLL_WAITERS", "4"))
+GALLERY_STAT_INTERVAL = float(os.getenv("GALLERY_STAT_INTERVAL", "5"))
+IMAGE_VARIANT_WIDTHS = tuple(
+    int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,960,1280").split(",") if w.strip()
+)
+# One worker (the DB lease holder) runs MAINTENANCE_JOBS; others stay idle.
+MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "1") == "1"
+MAINTENANCE_TICK = float(os.getenv("MAINTENANCE_TICK", "60"))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "500"))
+MAINTENANCE_MAX_BATCHES = int(os.getenv("MAINTENANCE_MAX_BATCHES", "50"))
+MAINTENANCE_VACUUM_PAGES = int(os.getenv("MAINTENANCE_VACUUM_PAGES", "1000"))
+CHAT_JOB_RETENTION = int(os.getenv("CHAT_JOB_RETENTION", "86400"))
+CHAT_ARCHIVE_AFTER_DAYS = int(os.getenv("CHAT_ARCHIVE_AFTER_DAYS", "90"))
+CHAT_ARCHIVE_DIR = os.getenv("CHAT_ARCHIVE_DIR", os.path.join(BASE_DIR, "archive", "chat"))
 AI_CHAT_ENABLED = os.getenv("ENABLE_AI_CHAT", "0") == "1"
+AI_CHAT_URL = os.getenv("AI_CHAT_URL", "https://aipipe.org/openrouter/v1/chat/completions")
+AI_CHAT_TIMEOUT = float(os.getenv("AI_CHAT_TIMEOUT", "15"))
+# "offload" answers /chat with a job id and runs the upstream call on a
+# bounded thread pool; "sync" keeps the call inside the request.
+AI_CHAT_MODE = os.getenv("AI_CHAT_MODE", "offload")
+AI_CHAT_WORKERS = int(os.getenv("AI_CHAT_WORKERS", "4"))
+AI_CHAT_QUEUE_LIMIT = int(os.getenv("AI_CHAT_QUEUE_LIMIT", "32"))
+AI_BREAKER_WINDOW = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+AI_BREAKER_MIN_CALLS = int(os.getenv("AI_BREAKER_MIN_CALLS", "5"))
+AI_BREAKER_FAILURE_RATE = float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5"))
+AI_BREAKER_COOLDOWN = float(os.getenv("AI_BREAKER_COOLDOWN", "30"))
+# Follow-up failures from the same browser within this window join its open ticket.
+AI_TICKET_COALESCE_SECONDS = int(os.getenv("AI_TICKET_COALESCE_SECONDS", "1800"))
+# Server-side chat history: turns kept per conversation, idle expiry, and caps.
+AI_HISTORY_TURNS = int(os.getenv("AI_HISTORY_TURNS", "10"))
+AI_HISTORY_TTL = int(os.getenv("AI_HISTORY_TTL", "3600"))
+AI_HISTORY_MAX_CONVERSATIONS = int(os.getenv("AI_HISTORY_MAX_CONVERSATIONS", "5000"))
+AI_HISTORY_MAX_CHARS = int(os.getenv("AI_HISTORY_MAX_CHARS", "1000"))
+AI_ANSWER_CACHE_SIZE = int(os.getenv("AI_ANSWER_CACHE_SIZE", "2000"))
+AI_ANSWER_CACHE_TTL = int(os.getenv("AI_ANSWER_CACHE_TTL", "86400"))
+# Similarity (0-1) for fuzzy matches; 0 (the default) serves exact normalized
+# keys only. Even when enabled, a match must share every content word and number.
+AI_ANSWER_FUZZY_CUTOFF = float(os.getenv("AI_ANSWER_FUZZY_CUTOFF", "0"))
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "webp", "pdf"}
 ALLOWED_RESUME_EXTENSIONS = {"pdf", "doc", "docx"}
+GALLERY_EXTENSIONS = {"png", "jpg", "jpeg", "webp", "gif"}
+VARIANTS_DIRNAME = "_variants"
+# Text assets that get a content fingerprint and precompressed siblings.
+COMPRESSIBLE_EXTENSIONS = {"css", "js", "svg", "json", "txt", "xml", "html"}
+# Runtime upload folders under static/ are never fingerprinted.
+UNVERSIONED_STATIC_DIRS = ("employee_docs/", "images/customer_uploads/")
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+REVIEW_STATUSES = ("pending", "approved", "rejected")
+TRACK_ID_TABLES = {"IF": "customer_submissions", "EMP": "employee_requests"}
 
 
 # ---------------- DB HELPERS ----------------
 
 def get_db_connection():
-    conn = sqlite3.connect(SQLITE_DB)
+    conn = sqlite3.connect(
+        SQLITE_DB,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row
+    # WAL lets readers run alongside the single writer; NORMAL sync is durable
+    # across app crashes and only skips the fsync on every commit.
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    # Makes INSERT OR REPLACE fire DELETE triggers so counters stay exact.
+    conn.execute("PRAGMA recursive_triggers = ON")
     return conn
 
 
+class ConnectionPool:
+    """Per-worker pool of tuned SQLite connections shared between threads."""
+
+    def __init__(self, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT):
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._idle = []
+        self._open = 0
+        self._in_use = 0
+        self._generation = 0
+        self._conn_generation = {}
+        self._counters = {
+            "checkouts": 0,
+            "connects": 0,
+            "reuses": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+        }
+
+    def _check_fork(self):
+        # gunicorn forks workers; never share a connection across processes.
+        if self._pid != os.getpid():
+            self._reset_state()
+
+    def acquire(self):
+        with self._cond:
+            self._check_fork()
+            conn = None
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._counters["reuses"] += 1
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    self._counters["connects"] += 1
+                    break
+                self._counters["waits"] += 1
+                if not self._cond.wait(self.timeout):
+                    self._counters["timeouts"] += 1
+                    raise sqlite3.OperationalError("database connection pool exhausted")
+            self._in_use += 1
+            self._counters["checkouts"] += 1
+
+        if conn is None:
+            try:
+                conn = get_db_connection()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._conn_generation[id(conn)] = self._generation
+        return conn
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._in_use -= 1
+            if self._conn_generation.get(id(conn)) != self._generation:
+                discard = True
+            if discard:
+                self._conn_generation.pop(id(conn), None)
+                self._open -= 1
+                self._counters["discarded"] += 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+        if discard:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as exc:
+            # Corruption or a vanished file poisons the connection; drop it.
+            discard = not isinstance(exc, (sqlite3.IntegrityError, sqlite3.OperationalError))
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def close_all(self):
+        # Connections checked out right now are closed when they come back.
+        with self._cond:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            for conn in idle:
+                self._conn_generation.pop(id(conn), None)
+        for conn in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        with self._cond:
+            self._check_fork()
+            return {
+                "pid": self._pid,
+                "max_size": self.max_size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "generation": self._generation,
+                **self._counters,
+            }
+
+
+db_pool = ConnectionPool()
+
+
 def fetch_all(query, params=()):
-    with get_db_connection() as conn:
+    with db_pool.connection() as conn:
         return [dict(row) for row in conn.execute(query, params).fetchall()]
 
 
 def fetch_one(query, params=()):
-    with get_db_connection() as conn:
-        row = conn.execute(query, params).fetchone()
+    with db_pool.connection() as conn:
+        cur = conn.execute(query, params)
+        row = cur.fetchone()
+        # Reset the statement so the pooled connection does not pin a WAL snapshot.
+        cur.close()
         return dict(row) if row else None
 
 
+@lru_cache(maxsize=256)
+def _namedtuple_row(columns):
+    return namedtuple("Row", columns, rename=True)._make
+
+
+def iter_rows(query, params=(), row_type="dict", arraysize=DB_FETCH_ARRAYSIZE, header=False):
+    # Lazy counterpart of fetch_all: rows arrive `arraysize` at a time and are
+    # never all in memory at once. row_type is "dict", "tuple" (cheapest) or
+    # "namedtuple"; header=True yields the column names first. The pooled
+    # connection is held until the iterator is exhausted or closed.
+    with db_pool.connection() as conn:
+        cur = conn.cursor()
+        if row_type != "dict":
+            cur.row_factory = None
+        cur.arraysize = arraysize
+        try:
+            cur.execute(query, params)
+            columns = tuple(col[0] for col in cur.description)
+            if header:
+                yield columns
+            make_row = {"dict": dict, "tuple": None, "namedtuple": _namedtuple_row(columns)}[row_type]
+            while True:
+                rows = cur.fetchmany()
+                if not rows:
+                    break
+                if make_row is None:
+                    yield from rows
+                else:
+                    yield from map(make_row, rows)
+        finally:
+            cur.close()
+
+
 def execute_query(query, params=()):
-    with get_db_connection() as conn:
+    with db_pool.connection() as conn:
         cur = conn.execute(query, params)
         conn.commit()
         return cur.lastrowid
 
 
-def init_database():
-    with get_db_connection() as conn:
-        conn.executescript(
-            """
+_active_transaction = threading.local()
+
+
+@contextmanager
+def transaction():
+    # Unit of work: every write inside lands in one commit (one WAL fsync) or
+    # none do. Nested calls on the same thread join the outer transaction.
+    outer = getattr(_active_transaction, "conn", None)
+    if outer is not None:
+        yield outer
+        return
+    with db_pool.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        _active_transaction.conn = conn
+        _active_transaction.callbacks = []
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            callbacks = _active_transaction.callbacks
+            _active_transaction.conn = _active_transaction.callbacks = None
+    for callback in callbacks:
+        callback()
+
+
+def on_commit(callback):
+    # Defers side effects (e.g. waking long-pollers) until the data is visible.
+    if getattr(_active_transaction, "conn", None) is None:
+        callback()
+    else:
+        _active_transaction.callbacks.append(callback)
+
+
+# ---------------- SCHEMA MIGRATIONS ----------------
+
+def run_sql_script(conn, script):
+    # Unlike executescript(), this keeps every statement inside the caller's
+    # transaction. complete_statement() keeps trigger bodies in one piece.
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            conn.execute(buffer)
+            buffer = ""
+    if buffer.strip():
+        conn.execute(buffer)
+
+
+def _migration_initial_schema(conn):
+    run_sql_script(
+        conn,
+        """
             CREATE TABLE IF NOT EXISTS admins (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT NOT NULL UNIQUE,
@@ -126,29 +463,418 @@ def init_database():
                 endpoint TEXT NOT NULL,
                 created_at INTEGER NOT NULL
             );
+            """,
+    )
+
+
+def _migration_employee_resume_file(conn):
+    # Databases created before resume uploads existed lack this column.
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(employee_requests)").fetchall()]
+    if "resume_file" not in cols:
+        conn.execute("ALTER TABLE employee_requests ADD COLUMN resume_file TEXT DEFAULT ''")
+
+
+def _migration_rate_limit_counters(conn):
+    run_sql_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS rate_limit_counters (
+            ip TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            window_start INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            expires_at INTEGER NOT NULL,
+            PRIMARY KEY (ip, endpoint, window_start)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_expires
+            ON rate_limit_counters (expires_at);
+        """,
+    )
+
+
+def _migration_admin_listing_indexes(conn):
+    run_sql_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_customer_submissions_status_id
+            ON customer_submissions (status, id);
+        CREATE INDEX IF NOT EXISTS idx_customer_submissions_time
+            ON customer_submissions (time);
+        CREATE INDEX IF NOT EXISTS idx_employee_requests_status_id
+            ON employee_requests (status, id);
+        CREATE INDEX IF NOT EXISTS idx_employee_requests_time
+            ON employee_requests (time);
+        """,
+    )
+
+
+def _counter_triggers(table, prefix, active_status):
+    # Keeps `<prefix>_total` and `<prefix>_<active_status>` in dashboard_counters
+    # in step with every insert, delete and status change on `table`.
+    total = f"{prefix}_total"
+    active = f"{prefix}_{active_status}"
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table}
+        BEGIN
+            UPDATE dashboard_counters SET value = value + 1 WHERE name = '{total}';
+            UPDATE dashboard_counters SET value = value + (NEW.status = '{active_status}') WHERE name = '{active}';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table}
+        BEGIN
+            UPDATE dashboard_counters SET value = value - 1 WHERE name = '{total}';
+            UPDATE dashboard_counters SET value = value - (OLD.status = '{active_status}') WHERE name = '{active}';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_count_status AFTER UPDATE OF status ON {table}
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE dashboard_counters
+            SET value = value + (NEW.status = '{active_status}') - (OLD.status = '{active_status}')
+            WHERE name = '{active}';
+        END;
+    """
+
+
+DASHBOARD_COUNTER_SOURCES = {
+    "customers_total": "SELECT COUNT(*) FROM customer_submissions",
+    "customers_pending": "SELECT COUNT(*) FROM customer_submissions WHERE status = 'pending'",
+    "employees_total": "SELECT COUNT(*) FROM employee_requests",
+    "employees_pending": "SELECT COUNT(*) FROM employee_requests WHERE status = 'pending'",
+    "tickets_total": "SELECT COUNT(*) FROM chat_threads",
+    "tickets_open": "SELECT COUNT(*) FROM chat_threads WHERE status = 'open'",
+}
+
+
+def recount_dashboard_counters(conn):
+    for name, query in DASHBOARD_COUNTER_SOURCES.items():
+        conn.execute(
+            f"INSERT OR REPLACE INTO dashboard_counters (name, value) VALUES (?, ({query}))",
+            (name,),
+        )
+
+
+def _migration_dashboard_counters(conn):
+    run_sql_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS dashboard_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        );
+        """
+        + _counter_triggers("customer_submissions", "customers", "pending")
+        + _counter_triggers("employee_requests", "employees", "pending")
+        + _counter_triggers("chat_threads", "tickets", "open"),
+    )
+    recount_dashboard_counters(conn)
+
+
+def _migration_track_id_sequences(conn):
+    run_sql_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS track_id_sequences (
+            prefix TEXT NOT NULL,
+            day TEXT NOT NULL,
+            last_value INTEGER NOT NULL,
+            PRIMARY KEY (prefix, day)
+        ) WITHOUT ROWID;
+        """,
+    )
+    # Continue from the highest sequence already issued for each day.
+    for prefix, table in TRACK_ID_TABLES.items():
+        day_start = len(prefix) + 2
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO track_id_sequences (prefix, day, last_value)
+            SELECT ?, substr(track_id, {day_start}, 6), MAX(CAST(substr(track_id, {day_start + 7}) AS INTEGER))
+            FROM {table}
+            WHERE track_id GLOB ?
+            GROUP BY substr(track_id, {day_start}, 6)
+            """,
+            (prefix, f"{prefix}-[0-9][0-9][0-9][0-9][0-9][0-9]-[0-9]*"),
+        )
+
+
+def _migration_hot_query_indexes(conn):
+    run_sql_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_chat_messages_thread_id
+            ON chat_messages (thread_id, id);
+        CREATE INDEX IF NOT EXISTS idx_chat_messages_thread_sender
+            ON chat_messages (thread_id, sender, id);
+        CREATE INDEX IF NOT EXISTS idx_chat_threads_status_updated
+            ON chat_threads (status, updated_at);
+        """,
+    )
+
+
+def _migration_chat_jobs(conn):
+    run_sql_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS chat_jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            reply TEXT,
+            admin INTEGER NOT NULL DEFAULT 0,
+            ticket_id TEXT,
+            created_at INTEGER NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_chat_jobs_created ON chat_jobs (created_at);
+        """,
+    )
+
+
+def _migration_chat_thread_client_key(conn):
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(chat_threads)").fetchall()]
+    if "client_key" not in cols:
+        conn.execute("ALTER TABLE chat_threads ADD COLUMN client_key TEXT")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_chat_threads_client
+            ON chat_threads (client_key, status, updated_at)
+        """
+    )
+
+
+def _migration_maintenance(conn):
+    run_sql_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS maintenance_lease (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS maintenance_runs (
+            job TEXT PRIMARY KEY,
+            runs INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            rows_total INTEGER NOT NULL DEFAULT 0,
+            last_started_at REAL,
+            last_duration_ms REAL,
+            last_rows INTEGER,
+            last_error TEXT
+        );
+        """,
+    )
+
+
+# scope -> (FTS5 table, content table, indexed columns). External-content
+# tables: the index stores only terms, the text stays in the source table.
+SEARCH_INDEXES = {
+    "cust": ("customer_search", "customer_submissions", ("track_id", "name", "phone", "message")),
+    "emp": ("employee_search", "employee_requests",
+            ("track_id", "name", "phone", "work_type", "experience", "message", "admin_note")),
+    "chat": ("chat_message_search", "chat_messages", ("message",)),
+}
+
+
+def fts5_available(conn):
+    return any(row[0] == "ENABLE_FTS5" for row in conn.execute("PRAGMA compile_options").fetchall())
+
+
+def _search_triggers(fts, table, columns):
+    cols = ", ".join(columns)
+    new = ", ".join(f"NEW.{c}" for c in columns)
+    old = ", ".join(f"OLD.{c}" for c in columns)
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update AFTER UPDATE OF {cols} ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old});
+            INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new});
+        END;
+    """
+
+
+def create_search_index(conn, rebuild=False):
+    for fts, table, columns in SEARCH_INDEXES.values():
+        run_sql_script(
+            conn,
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {", ".join(columns)},
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            );
             """
+            + _search_triggers(fts, table, columns),
         )
-        cols = [r["name"] for r in conn.execute("PRAGMA table_info(employee_requests)").fetchall()]
-        if "resume_file" not in cols:
-            conn.execute("ALTER TABLE employee_requests ADD COLUMN resume_file TEXT DEFAULT ''")
-        conn.commit()
+        if rebuild:
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
 
 
-def generate_track_id(prefix, table_name):
-    date_part = datetime.now().strftime("%y%m%d")
-    like_pattern = f"{prefix}-{date_part}-%"
-    rows = fetch_all(
-        f"SELECT track_id FROM {table_name} WHERE track_id LIKE ?",
-        (like_pattern,),
+def _migration_search_index(conn):
+    # Builds without FTS5 skip this step; `flask rebuild-search-index` can
+    # create the index later on a build that has it.
+    if fts5_available(conn):
+        create_search_index(conn, rebuild=True)
+
+
+def _migration_customer_image_index(conn):
+    # Bulk deletes check whether an upload is still referenced before removing it.
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_customer_submissions_image ON customer_submissions (image)"
     )
 
-    max_seq = 0
-    for row in rows:
-        parts = (row.get("track_id") or "").split("-")
-        if len(parts) == 3 and parts[2].isdigit():
-            max_seq = max(max_seq, int(parts[2]))
 
-    return f"{prefix}-{date_part}-{str(max_seq + 1).zfill(4)}"
+# Append-only: never edit or reorder a step once it has shipped.
+MIGRATIONS = [
+    (1, "initial schema", _migration_initial_schema),
+    (2, "employee_requests.resume_file", _migration_employee_resume_file),
+    (3, "rate_limit_counters", _migration_rate_limit_counters),
+    (4, "admin listing indexes", _migration_admin_listing_indexes),
+    (5, "dashboard counters", _migration_dashboard_counters),
+    (6, "track id sequences", _migration_track_id_sequences),
+    (7, "hot query indexes", _migration_hot_query_indexes),
+    (8, "chat jobs", _migration_chat_jobs),
+    (9, "chat_threads.client_key", _migration_chat_thread_client_key),
+    (10, "maintenance lease and runs", _migration_maintenance),
+    (11, "full-text search index", _migration_search_index),
+    (12, "customer_submissions.image index", _migration_customer_image_index),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    row = conn.execute("SELECT MAX(version) AS v FROM schema_version").fetchone()
+    return row["v"] or 0
+
+
+def migrate_database():
+    applied = []
+    with db_pool.connection() as conn:
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            conn.commit()
+            return applied
+
+        # IMMEDIATE takes the write lock up front so concurrently booting
+        # workers queue behind each other instead of racing the same step.
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = get_schema_version(conn)
+            for version, name, step in MIGRATIONS:
+                if version <= current:
+                    continue
+                step(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                )
+                applied.append(version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
+
+
+_db_identity = None
+_db_lock = threading.Lock()
+
+
+def _db_file_identity():
+    try:
+        st = os.stat(SQLITE_DB)
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def ensure_database():
+    # Hot-path check: one stat() call. Migrations only run again if the DB file
+    # is missing or was replaced underneath the worker.
+    global _db_identity
+    identity = _db_file_identity()
+    if identity is not None and identity == _db_identity:
+        return
+    with _db_lock:
+        identity = _db_file_identity()
+        if identity is not None and identity == _db_identity:
+            return
+        if _db_identity is not None:
+            db_pool.close_all()
+        migrate_database()
+        _db_identity = _db_file_identity()
+
+
+@app.cli.command("migrate-db")
+def migrate_db_command():
+    """Apply pending schema migrations to the SQLite database."""
+    applied = migrate_database()
+    if applied:
+        print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+    else:
+        print(f"Schema already at version {SCHEMA_VERSION}.")
+
+
+def insert_with_track_id(prefix, columns, values):
+    # Allocates the next `<prefix>-<yymmdd>-<seq>` and inserts the row in one
+    # write transaction, so concurrent workers can never hand out the same ID.
+    table = TRACK_ID_TABLES[prefix]
+    day = datetime.now().strftime("%y%m%d")
+    placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+    insert_sql = f"INSERT INTO {table} (track_id, {', '.join(columns)}) VALUES ({placeholders})"
+
+    for attempt in range(TRACK_ID_ATTEMPTS):
+        try:
+            with db_pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for _ in range(TRACK_ID_ATTEMPTS):
+                    conn.execute(
+                        """
+                        INSERT INTO track_id_sequences (prefix, day, last_value) VALUES (?, ?, 1)
+                        ON CONFLICT (prefix, day) DO UPDATE SET last_value = last_value + 1
+                        """,
+                        (prefix, day),
+                    )
+                    seq = conn.execute(
+                        "SELECT last_value FROM track_id_sequences WHERE prefix = ? AND day = ?",
+                        (prefix, day),
+                    ).fetchone()["last_value"]
+                    track_id = f"{prefix}-{day}-{str(seq).zfill(4)}"
+                    try:
+                        conn.execute(insert_sql, (track_id, *values))
+                    except sqlite3.IntegrityError as exc:
+                        # A row inserted outside the allocator already owns this
+                        # ID; the failed statement is undone, so skip ahead.
+                        if f"{table}.track_id" not in str(exc):
+                            raise
+                        continue
+                    conn.commit()
+                    return track_id
+                raise sqlite3.IntegrityError(f"could not allocate a free {prefix} track ID")
+        except sqlite3.OperationalError:
+            # Lock contention that outlasted busy_timeout; back off and retry.
+            if attempt == TRACK_ID_ATTEMPTS - 1:
+                raise
+            time.sleep(0.05 * (attempt + 1))
 
 
 # ---------------- CHAT HELPERS ----------------
@@ -161,43 +887,166 @@ def load_chat():
     return {"pending": pending, "answered": answered}
 
 
-def create_support_ticket(question, category="general"):
+class EventHub:
+    """In-process hub that wakes long-polling clients when a keyed record changes."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._cond = threading.Condition()
+        self._versions = OrderedDict()
+
+    def version(self, key):
+        with self._cond:
+            return self._versions.get(key, 0)
+
+    def notify(self, key):
+        with self._cond:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._versions.move_to_end(key)
+            while len(self._versions) > self.max_keys:
+                self._versions.popitem(last=False)
+            self._cond.notify_all()
+
+    def wait(self, key, seen_version, timeout):
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._versions.get(key, 0) != seen_version,
+                timeout=timeout,
+            )
+
+
+ticket_events = EventHub()
+long_poll_slots = threading.BoundedSemaphore(CHAT_LONG_POLL_WAITERS)
+
+
+@contextmanager
+def long_poll_slot(wait_seconds):
+    # Yields the wait actually granted: 0 when every slot is taken, so the
+    # request answers at once and the client falls back to plain polling.
+    if wait_seconds <= 0 or not long_poll_slots.acquire(blocking=False):
+        yield 0
+        return
+    try:
+        yield wait_seconds
+    finally:
+        long_poll_slots.release()
+
+
+def create_support_ticket(question, category="general", client_key=None):
     ticket_id = str(uuid.uuid4())[:8]
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    execute_query(
-        "INSERT OR REPLACE INTO chat_pending (id, question) VALUES (?, ?)",
-        (ticket_id, question),
-    )
-    execute_query(
-        """
-        INSERT OR REPLACE INTO chat_threads (id, status, category, created_at, updated_at)
-        VALUES (?, 'open', ?, ?, ?)
-        """,
-        (ticket_id, category, now, now),
-    )
-    execute_query(
-        """
-        INSERT INTO chat_messages (thread_id, sender, message, created_at)
-        VALUES (?, 'user', ?, ?)
-        """,
-        (ticket_id, question, now),
-    )
+    with transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO chat_pending (id, question) VALUES (?, ?)",
+            (ticket_id, question),
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO chat_threads (id, status, category, created_at, updated_at, client_key)
+            VALUES (?, 'open', ?, ?, ?, ?)
+            """,
+            (ticket_id, category, now, now, client_key),
+        )
+        conn.execute(
+            """
+            INSERT INTO chat_messages (thread_id, sender, message, created_at)
+            VALUES (?, 'user', ?, ?)
+            """,
+            (ticket_id, question, now),
+        )
     return ticket_id
 
 
+def open_or_append_support_ticket(question, client_key=None):
+    # During an AI outage every message fails; keep one conversation per
+    # browser instead of flooding the queue with one-line tickets.
+    with transaction() as conn:
+        if client_key and AI_TICKET_COALESCE_SECONDS > 0:
+            cutoff = (datetime.now() - timedelta(seconds=AI_TICKET_COALESCE_SECONDS)).strftime("%Y-%m-%d %H:%M:%S")
+            thread = conn.execute(
+                """
+                SELECT id FROM chat_threads
+                WHERE client_key = ? AND status = 'open' AND updated_at >= ?
+                ORDER BY updated_at DESC
+                LIMIT 1
+                """,
+                (client_key, cutoff),
+            ).fetchone()
+            if thread:
+                add_customer_message(thread["id"], question)
+                return thread["id"]
+        return create_support_ticket(question, client_key=client_key)
+
+
 def add_chat_message(ticket_id, sender, message):
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    execute_query(
-        """
-        INSERT INTO chat_messages (thread_id, sender, message, created_at)
-        VALUES (?, ?, ?, ?)
-        """,
-        (ticket_id, sender, message, now),
-    )
-    execute_query(
-        "UPDATE chat_threads SET updated_at = ? WHERE id = ?",
-        (now, ticket_id),
-    )
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO chat_messages (thread_id, sender, message, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (ticket_id, sender, message, now),
+        )
+        conn.execute(
+            "UPDATE chat_threads SET updated_at = ? WHERE id = ?",
+            (now, ticket_id),
+        )
+        on_commit(lambda: ticket_events.notify(ticket_id))
+
+
+def add_customer_message(ticket_id, message):
+    # A customer follow-up also becomes the thread's pending question.
+    with transaction() as conn:
+        add_chat_message(ticket_id, "user", message)
+        conn.execute(
+            "INSERT OR REPLACE INTO chat_pending (id, question) VALUES (?, ?)",
+            (ticket_id, message),
+        )
+
+
+def close_chat_thread(ticket_id):
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE chat_threads SET status = 'closed', updated_at = ? WHERE id = ?",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), ticket_id),
+        )
+        conn.execute("DELETE FROM chat_pending WHERE id = ?", (ticket_id,))
+        on_commit(lambda: ticket_events.notify(ticket_id))
+
+
+def load_thread_messages(thread_ids, limit_per_thread=None):
+    # One query per chunk of threads instead of one query per thread. With
+    # limit_per_thread only the newest K messages of each thread are kept.
+    grouped = {thread_id: [] for thread_id in thread_ids}
+    ids = list(grouped)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        if limit_per_thread is None:
+            query = f"""
+                SELECT id, thread_id, sender, message, created_at
+                FROM chat_messages
+                WHERE thread_id IN ({placeholders})
+                ORDER BY thread_id, id ASC
+            """
+            params = chunk
+        else:
+            query = f"""
+                SELECT id, thread_id, sender, message, created_at
+                FROM (
+                    SELECT id, thread_id, sender, message, created_at,
+                           ROW_NUMBER() OVER (PARTITION BY thread_id ORDER BY id DESC) AS rn
+                    FROM chat_messages
+                    WHERE thread_id IN ({placeholders})
+                )
+                WHERE rn <= ?
+                ORDER BY thread_id, id ASC
+            """
+            params = [*chunk, limit_per_thread]
+        for row in iter_rows(query, params):
+            grouped[row.pop("thread_id")].append(row)
+    return grouped
 
 
 def get_chat_messages(ticket_id, after_id=0):
@@ -212,6 +1061,400 @@ def get_chat_messages(ticket_id, after_id=0):
     )
 
 
+def wait_for_chat_messages(ticket_id, after_id, wait_seconds):
+    # Bounded long-poll. Replies posted in this worker wake the waiter at once;
+    # the periodic re-check picks up replies handled by another worker.
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        seen_version = ticket_events.version(ticket_id)
+        thread = fetch_one("SELECT id, status FROM chat_threads WHERE id = ?", (ticket_id,))
+        if not thread:
+            return None, []
+        msgs = get_chat_messages(ticket_id, after_id)
+        remaining = deadline - time.monotonic()
+        if msgs or thread["status"] != "open" or remaining <= 0:
+            return thread, msgs
+        ticket_events.wait(ticket_id, seen_version, min(remaining, CHAT_LONG_POLL_RECHECK))
+
+
+# ---------------- AI ASSISTANT ----------------
+
+AI_SYSTEM_INSTRUCTION = """
+        You are the official AI assistant for I.F Fashion.
+
+        About the company:
+        - We provide custom fashion design services.
+        - Customers can upload their own design ideas and images.
+        - Our team reviews submissions and creates tailored fashion products.
+        - Users receive a tracking ID to track their request status.
+        - We also hire employees through the careers section.
+
+        How the website works:
+        1. Customer uploads design via the website.
+        2. Admin reviews and approves/rejects the request.
+        3. Work starts after approval.
+        4. Customer can track status using tracking ID.
+
+        Customer Help:
+        - If user wants help, guide them step-by-step.
+        - If they ask about contact, provide this:
+
+        Contact Page:
+        /customer_contact
+
+        - Tell users they can reach out via the contact form for support.
+
+        Admin Assistance:
+        - If the AI cannot solve something, inform the user:
+        "I will connect you to a human assistant."
+        - Explain that their query will be forwarded to admin support.
+
+        Your behavior:
+        - Answer ONLY based on I.F Fashion services.
+        - Be clear, helpful, and slightly conversational.
+        - Always guide users on what to do next.
+        - If question is unrelated, politely say you only assist with this website.
+        """
+
+# One keep-alive connection pool to the upstream, shared by all chat threads.
+ai_http = requests.Session()
+_ai_adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(AI_CHAT_WORKERS, 4))
+ai_http.mount("https://", _ai_adapter)
+ai_http.mount("http://", _ai_adapter)
+ai_executor = ThreadPoolExecutor(max_workers=AI_CHAT_WORKERS, thread_name_prefix="ai-chat")
+ai_queue_slots = threading.BoundedSemaphore(AI_CHAT_QUEUE_LIMIT)
+chat_job_events = EventHub()
+
+
+class AIUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker: closed -> open -> half_open -> closed."""
+
+    def __init__(self, window=AI_BREAKER_WINDOW, min_calls=AI_BREAKER_MIN_CALLS,
+                 failure_rate=AI_BREAKER_FAILURE_RATE, cooldown=AI_BREAKER_COOLDOWN):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._results = deque(maxlen=max(1, window))
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def _current_state(self):
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = "half_open"
+            self._trial_in_flight = False
+        return self._state
+
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def allow(self):
+        # Half-open lets exactly one trial call through to probe the upstream.
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def _open(self):
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        self._results.clear()
+        self._counters["opened"] += 1
+
+    def record_success(self):
+        with self._lock:
+            self._counters["successes"] += 1
+            if self._state == "half_open":
+                self._state = "closed"
+                self._results.clear()
+            self._results.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            self._counters["failures"] += 1
+            if self._state == "half_open":
+                self._open()
+                return
+            self._results.append(False)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate:
+                self._open()
+
+    def stats(self):
+        with self._lock:
+            return {"state": self._current_state(), "window_calls": len(self._results),
+                    "window_failures": list(self._results).count(False), **self._counters}
+
+
+ai_breaker = CircuitBreaker()
+
+
+def normalize_question(text):
+    # Case, punctuation and whitespace folding: "Track ID??" == "track id".
+    folded = "".join(ch if ch.isalnum() else " " for ch in (text or "").casefold())
+    return " ".join(folded.split())
+
+
+# Filler words a fuzzy match may differ in. Negations ("not", the "t" of
+# "can't"), days, numbers and question words are content and must match.
+QUESTION_STOPWORDS = frozenset(
+    "a an the is are am was were be do does did i me my you your we our us it its "
+    "to of for on in at by with and or please".split()
+)
+
+
+def question_terms(key):
+    return frozenset(key.split()) - QUESTION_STOPWORDS
+
+
+class AnswerCache:
+    """LRU + TTL cache of assistant replies keyed by normalized question."""
+
+    def __init__(self, max_size=AI_ANSWER_CACHE_SIZE, ttl=AI_ANSWER_CACHE_TTL,
+                 fuzzy_cutoff=AI_ANSWER_FUZZY_CUTOFF):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (reply, expires_at)
+        self._seeded_at = None
+        self._counters = {"hits": 0, "fuzzy_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def _seed(self, now):
+        # Answers admins already gave in chat_answered warm the cache; they are
+        # re-read once per TTL so edits there eventually show up.
+        self._seeded_at = now
+        rows = iter_rows("SELECT question, reply FROM chat_answered ORDER BY rowid ASC", row_type="tuple")
+        for question, reply in rows:
+            key = normalize_question(question)
+            if key and reply:
+                self._store(key, reply, now)
+
+    def _store(self, key, reply, now):
+        self._entries[key] = (reply, now + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._entries[key]
+            self._counters["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def get(self, question):
+        key = normalize_question(question)
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            if self._seeded_at is None or now - self._seeded_at >= self.ttl:
+                self._seed(now)
+            reply = self._lookup(key, now)
+            if reply is not None:
+                self._counters["hits"] += 1
+                return reply
+            if self.fuzzy_cutoff <= 0:
+                self._counters["misses"] += 1
+                return None
+            candidates = list(self._entries)
+        # difflib is O(entries); run it outside the lock so other /chat
+        # requests are not queued behind a miss.
+        terms = question_terms(key)
+        matches = difflib.get_close_matches(key, candidates, n=3, cutoff=self.fuzzy_cutoff)
+        match = next((m for m in matches if question_terms(m) == terms), None)
+        with self._lock:
+            reply = self._lookup(match, now) if match else None
+            self._counters["fuzzy_hits" if reply is not None else "misses"] += 1
+            return reply
+
+    def put(self, question, reply):
+        key = normalize_question(question)
+        if key and reply:
+            with self._lock:
+                self._store(key, reply, time.time())
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["fuzzy_hits"] + self._counters["misses"]
+            hit_rate = (self._counters["hits"] + self._counters["fuzzy_hits"]) / lookups if lookups else 0.0
+            return {"size": len(self._entries), "max_size": self.max_size, "hit_rate": round(hit_rate, 4),
+                    **self._counters}
+
+
+answer_cache = AnswerCache()
+
+
+class ConversationStore:
+    """Per-conversation ring buffers of recent chat turns, LRU + idle TTL."""
+
+    def __init__(self, turns=AI_HISTORY_TURNS, ttl=AI_HISTORY_TTL,
+                 max_conversations=AI_HISTORY_MAX_CONVERSATIONS, max_chars=AI_HISTORY_MAX_CHARS):
+        self.turns = max(1, turns)
+        self.ttl = ttl
+        self.max_conversations = max(1, max_conversations)
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._conversations = OrderedDict()  # key -> (deque of turns, expires_at)
+        self._counters = {"evictions": 0, "expired": 0}
+
+    def _live(self, key, now):
+        entry = self._conversations.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._conversations[key]
+            self._counters["expired"] += 1
+            return None
+        return entry[0]
+
+    def history(self, key):
+        with self._lock:
+            turns = self._live(key, time.time())
+            return list(turns) if turns else []
+
+    def append(self, key, role, text):
+        if not key or not text:
+            return
+        now = time.time()
+        with self._lock:
+            turns = self._live(key, now)
+            if turns is None:
+                turns = deque(maxlen=self.turns)
+            turns.append({"role": role, "content": text[:self.max_chars]})
+            self._conversations[key] = (turns, now + self.ttl)
+            self._conversations.move_to_end(key)
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self, key):
+        with self._lock:
+            self._conversations.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"conversations": len(self._conversations), "max_conversations": self.max_conversations,
+                    "turns_per_conversation": self.turns, **self._counters}
+
+
+conversations = ConversationStore()
+
+
+def ask_ai_assistant(user_msg, history=None):
+    payload = {
+        "model": "openai/gpt-4.1-nano",
+        "messages": [
+            {"role": "system", "content": AI_SYSTEM_INSTRUCTION},
+            *(history or []),
+            {"role": "user", "content": user_msg}
+        ]
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {os.getenv('AIPIPE_TOKEN')}"
+    }
+    if not ai_breaker.allow():
+        raise AIUnavailable("AI upstream circuit is open")
+    try:
+        response = ai_http.post(AI_CHAT_URL, headers=headers, json=payload, timeout=AI_CHAT_TIMEOUT)
+        if response.status_code != 200:
+            raise AIUnavailable(f"AI upstream returned {response.status_code}")
+        res_data = response.json()
+        reply = res_data["choices"][0]["message"]["content"].strip()
+    except Exception:
+        ai_breaker.record_failure()
+        raise
+    ai_breaker.record_success()
+    if not history:
+        # Only stand-alone answers are reusable; follow-ups depend on context.
+        answer_cache.put(user_msg, reply)
+    return reply
+
+
+def chat_fallback(user_msg, client_key=None):
+    ticket_id = open_or_append_support_ticket(user_msg, client_key)
+    return {
+        "reply": "I'm connecting you to a human assistant. One moment...",
+        "admin": True,
+        "ticket_id": ticket_id
+    }
+
+
+def submit_chat_job(user_msg, client_key=None, history=None):
+    if not ai_queue_slots.acquire(blocking=False):
+        return None
+    job_id = uuid.uuid4().hex[:16]
+    try:
+        execute_query(
+            "INSERT INTO chat_jobs (id, status, created_at) VALUES (?, 'pending', ?)",
+            (job_id, int(time.time())),
+        )
+        ai_executor.submit(run_chat_job, job_id, user_msg, client_key, history)
+    except Exception:
+        ai_queue_slots.release()
+        raise
+    return job_id
+
+
+def run_chat_job(job_id, user_msg, client_key=None, history=None):
+    # The row is always finalised: a job the fallback could not handle either
+    # is marked failed instead of staying pending until it is purged.
+    status, result = "failed", {"reply": None, "admin": True}
+    try:
+        try:
+            result = {"reply": ask_ai_assistant(user_msg, history), "admin": False}
+            conversations.append(client_key, "assistant", result["reply"])
+        except Exception:
+            result = chat_fallback(user_msg, client_key)
+        status = "done"
+    except Exception:
+        app.logger.exception("Chat job %s failed", job_id)
+    finally:
+        try:
+            execute_query(
+                "UPDATE chat_jobs SET status = ?, reply = ?, admin = ?, ticket_id = ? WHERE id = ?",
+                (status, result["reply"], int(result["admin"]), result.get("ticket_id"), job_id),
+            )
+            chat_job_events.notify(job_id)
+        except Exception:
+            app.logger.exception("Could not record chat job %s", job_id)
+        ai_queue_slots.release()
+
+
+def wait_for_chat_job(job_id, wait_seconds):
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        seen_version = chat_job_events.version(job_id)
+        job = fetch_one(
+            "SELECT id, status, reply, admin, ticket_id FROM chat_jobs WHERE id = ?",
+            (job_id,),
+        )
+        remaining = deadline - time.monotonic()
+        if not job or job["status"] != "pending" or remaining <= 0:
+            return job
+        chat_job_events.wait(job_id, seen_version, min(remaining, CHAT_LONG_POLL_RECHECK))
+
+
 # ---------------- TEMPLATE HELPERS ----------------
 
 @app.context_processor
@@ -220,6 +1463,123 @@ def inject_csrf_token():
     return {"csrf_token": lambda: ""}
 
 
+# ---------------- STATIC ASSETS ----------------
+
+class StaticAssets:
+    """Fingerprints and precompressed (.gz/.br) copies of text assets in static/."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assets = None
+
+    def _scan(self):
+        assets = {}
+        root = app.static_folder
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+            rel_dir = "" if rel_dir == "." else f"{rel_dir}/"
+            if rel_dir.startswith(UNVERSIONED_STATIC_DIRS):
+                dirnames[:] = []
+                continue
+            for name in filenames:
+                if name.rsplit(".", 1)[-1].lower() in COMPRESSIBLE_EXTENSIONS:
+                    assets[f"{rel_dir}{name}"] = self._build(os.path.join(dirpath, name))
+        return assets
+
+    @staticmethod
+    def _build(path):
+        with open(path, "rb") as fh:
+            data = fh.read()
+        encodings = {}
+        compressors = [("gzip", ".gz", lambda raw: gzip.compress(raw, 9, mtime=0))]
+        if brotli is not None:
+            compressors.append(("br", ".br", lambda raw: brotli.compress(raw, quality=11)))
+        for encoding, suffix, compress in compressors:
+            target = path + suffix
+            if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+                tmp = f"{target}.tmp"
+                with open(tmp, "wb") as fh:
+                    fh.write(compress(data))
+                os.replace(tmp, target)
+            # Tiny files can grow when compressed; serve those as-is.
+            if os.path.getsize(target) < len(data):
+                encodings[encoding] = suffix
+        return {
+            "version": hashlib.sha1(data).hexdigest()[:12],
+            "mtime": os.path.getmtime(path),
+            "encodings": encodings,
+        }
+
+    def build(self):
+        with self._lock:
+            self._assets = self._scan()
+        return self._assets
+
+    def get(self, filename):
+        assets = self._assets
+        if assets is None:
+            assets = self.build()
+        asset = assets.get(filename)
+        if asset is not None and app.debug:
+            path = os.path.join(app.static_folder, filename)
+            if os.path.exists(path) and os.path.getmtime(path) != asset["mtime"]:
+                with self._lock:
+                    asset = assets[filename] = self._build(path)
+        return asset
+
+
+static_assets = StaticAssets()
+
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    if endpoint != "static" or "v" in values:
+        return
+    asset = static_assets.get(values.get("filename", ""))
+    if asset is not None:
+        values["v"] = asset["version"]
+
+
+def serve_static(filename):
+    asset = static_assets.get(filename)
+    encoding = None
+    if asset is not None and asset["encodings"]:
+        offered = [e for e in ("br", "gzip") if e in asset["encodings"]]
+        encoding = request.accept_encodings.best_match(offered)
+
+    if encoding:
+        response = send_from_directory(
+            app.static_folder,
+            filename + asset["encodings"][encoding],
+            mimetype=mimetypes.guess_type(filename)[0],
+        )
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response = app.send_static_file(filename)
+    if asset is not None:
+        response.vary.add("Accept-Encoding")
+
+    # Fingerprinted URLs and content-addressed variants never change.
+    versioned = asset is not None and request.args.get("v") == asset["version"]
+    if versioned or f"/{VARIANTS_DIRNAME}/" in f"/{filename}":
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+app.view_functions["static"] = serve_static
+
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Fingerprint and precompress text assets under static/."""
+    assets = static_assets.build()
+    for filename, asset in sorted(assets.items()):
+        print(f"{filename} v={asset['version']} {' '.join(asset['encodings']) or 'uncompressed'}")
+
+
 # ---------------- HEALTH CHECK ----------------
 
 @app.route("/health")
@@ -242,8 +1602,11 @@ def setup_app():
         os.makedirs(EMPLOYEE_FOLDER, exist_ok=True)
         _initialized = True
 
-    # Keep this on every request so the app self-recovers if DB file is deleted.
-    init_database()
+    # Migrates once per worker; afterwards only stats the DB file so the app
+    # still self-recovers if it is deleted.
+    ensure_database()
+    if MAINTENANCE_ENABLED:
+        maintenance.start()
 
 
 # ---------------- HELPERS ----------------
@@ -256,10 +1619,6 @@ def allowed_resume_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_RESUME_EXTENSIONS
 
 
-def current_ts():
-    return int(datetime.now().timestamp())
-
-
 def get_client_ip():
     forwarded = request.headers.get("X-Forwarded-For", "")
     if forwarded:
@@ -267,27 +1626,6 @@ def get_client_ip():
     return (request.remote_addr or "unknown").strip()
 
 
-def is_rate_limited(ip, endpoint, limit_count, window_seconds):
-    now = current_ts()
-    cutoff = now - window_seconds
-    execute_query(
-        "DELETE FROM request_limits WHERE created_at < ?",
-        (cutoff,),
-    )
-    recent = fetch_one(
-        "SELECT COUNT(*) AS c FROM request_limits WHERE ip = ? AND endpoint = ? AND created_at >= ?",
-        (ip, endpoint, cutoff),
-    )
-    if recent and recent["c"] >= limit_count:
-        return True
-
-    execute_query(
-        "INSERT INTO request_limits (ip, endpoint, created_at) VALUES (?, ?, ?)",
-        (ip, endpoint, now),
-    )
-    return False
-
-
 def normalize_phone(phone_raw):
     digits = "".join(ch for ch in (phone_raw or "") if ch.isdigit())
     if len(digits) == 12 and digits.startswith("91"):
@@ -306,6 +1644,99 @@ def clean_aadhaar(aadhaar_raw):
     return "".join(ch for ch in (aadhaar_raw or "") if ch.isdigit())
 
 
+def parse_date_arg(value):
+    try:
+        return datetime.strptime((value or "").strip(), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def keyset_page(table, columns, prefix):
+    # Cursor pagination on id: `<prefix>_before` walks to older rows and
+    # `<prefix>_after` back to newer ones, so every page costs one index seek
+    # no matter how deep into history the admin is.
+    args = request.args
+    where, params = [], []
+
+    status = args.get(f"{prefix}_status", "")
+    if status in REVIEW_STATUSES:
+        where.append("status = ?")
+        params.append(status)
+    else:
+        status = ""
+
+    date_from = parse_date_arg(args.get(f"{prefix}_from"))
+    if date_from:
+        where.append("time >= ?")
+        params.append(date_from.isoformat())
+    date_to = parse_date_arg(args.get(f"{prefix}_to"))
+    if date_to:
+        where.append("time < ?")
+        params.append((date_to + timedelta(days=1)).isoformat())
+
+    size_raw = args.get(f"{prefix}_size", "")
+    size = int(size_raw) if size_raw.isdigit() else ADMIN_PAGE_SIZES[prefix]
+    size = max(1, min(size, ADMIN_MAX_PAGE_SIZE))
+
+    before = args.get(f"{prefix}_before", "")
+    after = args.get(f"{prefix}_after", "")
+    order = "DESC"
+    if after.isdigit():
+        where.append("id > ?")
+        params.append(int(after))
+        order = "ASC"
+    elif before.isdigit():
+        where.append("id < ?")
+        params.append(int(before))
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    rows = fetch_all(
+        f"SELECT {columns} FROM {table} {where_sql} ORDER BY id {order} LIMIT ?",
+        (*params, size + 1),
+    )
+    has_extra = len(rows) > size
+    rows = rows[:size]
+    if order == "ASC":
+        rows.reverse()
+        has_newer, has_older = has_extra, True
+    else:
+        has_newer, has_older = before.isdigit(), has_extra
+
+    return {
+        "rows": rows,
+        "status": status,
+        "date_from": date_from.isoformat() if date_from else "",
+        "date_to": date_to.isoformat() if date_to else "",
+        "size": size,
+        "newer_cursor": rows[0]["id"] if rows and has_newer else None,
+        "older_cursor": rows[-1]["id"] if rows and has_older else None,
+    }
+
+
+def dashboard_url(**overrides):
+    args = request.args.to_dict()
+    for key, value in overrides.items():
+        if value is None:
+            args.pop(key, None)
+        else:
+            args[key] = value
+    return url_for("admin_dashboard", **args)
+
+
+def get_dashboard_stats():
+    counters = {
+        row["name"]: row["value"]
+        for row in fetch_all("SELECT name, value FROM dashboard_counters")
+    }
+    return {
+        "total_customers": counters.get("customers_total", 0),
+        "total_employees": counters.get("employees_total", 0),
+        "pending_customers": counters.get("customers_pending", 0),
+        "pending_employees": counters.get("employees_pending", 0),
+        "pending_tickets": counters.get("tickets_open", 0),
+    }
+
+
 def is_valid_aadhaar(aadhaar_raw):
     num = clean_aadhaar(aadhaar_raw)
     if len(num) != 12:
@@ -340,6 +1771,649 @@ def is_valid_aadhaar(aadhaar_raw):
     return c == 0
 
 
+# ---------------- RATE LIMITING ----------------
+
+def _sliding_window(now, window_seconds):
+    # Sliding-window counter: the previous fixed window is weighted by how much
+    # of it still overlaps the trailing window ending at `now`.
+    window = max(1, int(window_seconds))
+    window_start = int(now // window) * window
+    prev_weight = 1.0 - (now - window_start) / window
+    return window, window_start, prev_weight
+
+
+class MemoryRateLimiter:
+    """Per-process limiter: O(1) per check, LRU-bounded number of tracked keys."""
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max(1, max_keys)
+        self._lock = threading.Lock()
+        # (ip, endpoint) -> [window_start, window, prev_hits, cur_hits]
+        self._buckets = OrderedDict()
+
+    def hit(self, ip, endpoint, limit_count, window_seconds, now=None):
+        now = time.time() if now is None else now
+        window, window_start, prev_weight = _sliding_window(now, window_seconds)
+        key = (ip, endpoint)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket[1] != window:
+                bucket = [window_start, window, 0, 0]
+                self._buckets[key] = bucket
+            elif bucket[0] != window_start:
+                carried = bucket[3] if bucket[0] == window_start - window else 0
+                bucket[0], bucket[2], bucket[3] = window_start, carried, 0
+            self._buckets.move_to_end(key)
+
+            limited = bucket[2] * prev_weight + bucket[3] >= limit_count
+            if not limited:
+                bucket[3] += 1
+            self._evict(now)
+        return limited
+
+    def _evict(self, now):
+        # Least recently used keys sit at the front; drop the ones whose both
+        # windows have fully elapsed, then enforce the hard cap.
+        for _ in range(8):
+            if not self._buckets:
+                break
+            key, bucket = next(iter(self._buckets.items()))
+            if bucket[0] + 2 * bucket[1] > now:
+                break
+            del self._buckets[key]
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "keys": len(self._buckets), "max_keys": self.max_keys}
+
+
+class SQLiteRateLimiter:
+    """Limiter shared by every worker through one counter row per window."""
+
+    @staticmethod
+    def _estimate(conn, ip, endpoint, window, window_start, prev_weight):
+        rows = conn.execute(
+            """
+            SELECT window_start, hits FROM rate_limit_counters
+            WHERE ip = ? AND endpoint = ? AND window_start IN (?, ?)
+            """,
+            (ip, endpoint, window_start - window, window_start),
+        ).fetchall()
+        hits = {row["window_start"]: row["hits"] for row in rows}
+        return hits.get(window_start - window, 0) * prev_weight + hits.get(window_start, 0)
+
+    def hit(self, ip, endpoint, limit_count, window_seconds, now=None):
+        now = time.time() if now is None else now
+        window, window_start, prev_weight = _sliding_window(now, window_seconds)
+        key = (ip, endpoint, window, window_start, prev_weight)
+
+        with db_pool.connection() as conn:
+            # Rejections are decided on a plain read, so an abuse burst never
+            # queues on the write lock. Only a hit that will be recorded takes
+            # it, and re-checks under it so racing workers cannot overshoot.
+            if self._estimate(conn, *key) >= limit_count:
+                return True
+            conn.execute("BEGIN IMMEDIATE")
+            if self._estimate(conn, *key) >= limit_count:
+                conn.rollback()
+                return True
+
+            conn.execute(
+                """
+                INSERT INTO rate_limit_counters (ip, endpoint, window_start, hits, expires_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (ip, endpoint, window_start) DO UPDATE SET hits = hits + 1
+                """,
+                (ip, endpoint, window_start, window_start + 2 * window),
+            )
+            # Expired windows are purged by the maintenance scheduler.
+            conn.commit()
+        return False
+
+    def stats(self):
+        row = fetch_one("SELECT COUNT(*) AS c FROM rate_limit_counters")
+        return {"backend": "sqlite", "keys": row["c"] if row else 0}
+
+
+RATE_LIMIT_BACKENDS = {
+    "memory": MemoryRateLimiter,
+    "sqlite": SQLiteRateLimiter,
+}
+
+if RATE_LIMIT_BACKEND not in RATE_LIMIT_BACKENDS:
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND}")
+rate_limiter = RATE_LIMIT_BACKENDS[RATE_LIMIT_BACKEND]()
+
+
+def is_rate_limited(ip, endpoint, limit_count, window_seconds):
+    return rate_limiter.hit(ip, endpoint, limit_count, window_seconds)
+
+
+# ---------------- MAINTENANCE ----------------
+
+def _purge_in_batches(delete_sql, params):
+    # Small transactions keep each write lock short; the pause between batches
+    # lets request writers in.
+    removed = 0
+    for _ in range(MAINTENANCE_MAX_BATCHES):
+        with transaction() as conn:
+            count = conn.execute(delete_sql, (*params, MAINTENANCE_BATCH_SIZE)).rowcount
+        removed += count
+        if count < MAINTENANCE_BATCH_SIZE:
+            break
+        time.sleep(0.05)
+    return removed
+
+
+def purge_rate_limit_counters():
+    return _purge_in_batches(
+        """
+        DELETE FROM rate_limit_counters WHERE (ip, endpoint, window_start) IN (
+            SELECT ip, endpoint, window_start FROM rate_limit_counters WHERE expires_at < ? LIMIT ?
+        )
+        """,
+        (int(time.time()),),
+    )
+
+
+def purge_request_limits():
+    # Legacy per-hit log, no longer written since the sliding-window limiter.
+    return _purge_in_batches(
+        "DELETE FROM request_limits WHERE id IN (SELECT id FROM request_limits ORDER BY id LIMIT ?)",
+        (),
+    )
+
+
+def purge_chat_jobs():
+    return _purge_in_batches(
+        """
+        DELETE FROM chat_jobs WHERE id IN (
+            SELECT id FROM chat_jobs WHERE created_at < ? ORDER BY created_at LIMIT ?
+        )
+        """,
+        (int(time.time()) - CHAT_JOB_RETENTION,),
+    )
+
+
+def archive_closed_threads():
+    cutoff = (datetime.now() - timedelta(days=CHAT_ARCHIVE_AFTER_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+    path = os.path.join(CHAT_ARCHIVE_DIR, f"chat-threads-{datetime.now():%Y%m}.jsonl.gz")
+    archived = 0
+    for _ in range(MAINTENANCE_MAX_BATCHES):
+        threads = fetch_all(
+            """
+            SELECT id, status, category, created_at, updated_at, client_key
+            FROM chat_threads
+            WHERE status = 'closed' AND updated_at < ?
+            ORDER BY updated_at
+            LIMIT ?
+            """,
+            (cutoff, MAINTENANCE_BATCH_SIZE),
+        )
+        if not threads:
+            break
+        ids = [thread["id"] for thread in threads]
+        messages = load_thread_messages(ids)
+        # Written before the delete: a crash in between re-archives the batch
+        # next run (a duplicate line) instead of losing it.
+        os.makedirs(CHAT_ARCHIVE_DIR, exist_ok=True)
+        with gzip.open(path, "at", encoding="utf-8") as fh:
+            for thread in threads:
+                fh.write(json.dumps({**thread, "messages": messages[thread["id"]]}, ensure_ascii=False) + "\n")
+        placeholders = ", ".join("?" for _ in ids)
+        with transaction() as conn:
+            conn.execute(f"DELETE FROM chat_messages WHERE thread_id IN ({placeholders})", ids)
+            conn.execute(f"DELETE FROM chat_pending WHERE id IN ({placeholders})", ids)
+            conn.execute(f"DELETE FROM chat_threads WHERE id IN ({placeholders})", ids)
+        archived += len(ids)
+        if len(ids) < MAINTENANCE_BATCH_SIZE:
+            break
+        time.sleep(0.05)
+    return archived
+
+
+def optimize_database():
+    with db_pool.connection() as conn:
+        conn.execute("PRAGMA optimize")
+    return 0
+
+
+def incremental_vacuum():
+    # Only effective once `flask run-maintenance --enable-incremental-vacuum`
+    # has switched the file to auto_vacuum=INCREMENTAL.
+    with db_pool.connection() as conn:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return 0
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({MAINTENANCE_VACUUM_PAGES})").fetchall()
+        return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+# (name, interval in seconds, job); jobs return the number of rows/pages handled.
+MAINTENANCE_JOBS = [
+    ("purge_rate_limit_counters", 300, purge_rate_limit_counters),
+    ("purge_request_limits", 3600, purge_request_limits),
+    ("purge_chat_jobs", 3600, purge_chat_jobs),
+    ("archive_closed_threads", 86400, archive_closed_threads),
+    ("optimize", 86400, optimize_database),
+    ("incremental_vacuum", 86400, incremental_vacuum),
+]
+
+
+class MaintenanceScheduler:
+    """Runs due MAINTENANCE_JOBS from the one worker holding the DB lease."""
+
+    lease_name = "maintenance"
+
+    def __init__(self, jobs, tick=MAINTENANCE_TICK):
+        self.jobs = jobs
+        self.tick = tick
+        self._lock = threading.Lock()
+        self._thread_pid = None
+        self._new_owner()
+
+    def _new_owner(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def start(self):
+        # gunicorn forks after import, so each worker starts its own thread.
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._new_owner()
+            threading.Thread(target=self._loop, name="maintenance", daemon=True).start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.tick)
+            try:
+                self.run_due()
+            except Exception:
+                app.logger.exception("Maintenance tick failed")
+
+    def acquire_lease(self):
+        # Take the lease if it is free or expired, or extend our own.
+        now = time.time()
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO maintenance_lease (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE maintenance_lease.owner = excluded.owner OR maintenance_lease.expires_at < ?
+                """,
+                (self.lease_name, self.owner, now + 3 * self.tick, now),
+            )
+            row = conn.execute(
+                "SELECT owner FROM maintenance_lease WHERE name = ?", (self.lease_name,)
+            ).fetchone()
+        return row["owner"] == self.owner
+
+    def release_lease(self):
+        execute_query(
+            "DELETE FROM maintenance_lease WHERE name = ? AND owner = ?", (self.lease_name, self.owner)
+        )
+
+    def run_due(self, only=None):
+        # With `only`, the named jobs run now regardless of their interval.
+        now = time.time()
+        last_started = {
+            row["job"]: row["last_started_at"]
+            for row in fetch_all("SELECT job, last_started_at FROM maintenance_runs")
+        }
+        results = {}
+        for name, interval, job in self.jobs:
+            if only is not None and name not in only:
+                continue
+            if only is None and now - (last_started.get(name) or 0) < interval:
+                continue
+            # Re-checked per job so a stalled leader cannot overlap a new one.
+            if not self.acquire_lease():
+                break
+            results[name] = self.run_job(name, job)
+        return results
+
+    def run_job(self, name, job):
+        started_at = time.time()
+        started = time.perf_counter()
+        rows, error = 0, None
+        try:
+            rows = job() or 0
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            app.logger.exception("Maintenance job %s failed", name)
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        execute_query(
+            """
+            INSERT INTO maintenance_runs
+                (job, runs, failures, rows_total, last_started_at, last_duration_ms, last_rows, last_error)
+            VALUES (?, 1, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (job) DO UPDATE SET
+                runs = runs + 1,
+                failures = failures + excluded.failures,
+                rows_total = rows_total + excluded.rows_total,
+                last_started_at = excluded.last_started_at,
+                last_duration_ms = excluded.last_duration_ms,
+                last_rows = excluded.last_rows,
+                last_error = excluded.last_error
+            """,
+            (name, int(error is not None), rows, started_at, duration_ms, rows, error),
+        )
+        return {"rows": rows, "duration_ms": duration_ms, "error": error}
+
+    def stats(self):
+        lease = fetch_one(
+            "SELECT owner, expires_at FROM maintenance_lease WHERE name = ?", (self.lease_name,)
+        )
+        return {
+            "enabled": MAINTENANCE_ENABLED,
+            "worker": self.owner,
+            "leader": lease["owner"] if lease and lease["expires_at"] >= time.time() else None,
+            "jobs": fetch_all("SELECT * FROM maintenance_runs ORDER BY job"),
+        }
+
+
+maintenance = MaintenanceScheduler(MAINTENANCE_JOBS)
+
+
+@app.cli.command("run-maintenance")
+@click.argument("jobs", nargs=-1)
+@click.option("--enable-incremental-vacuum", is_flag=True,
+              help="Switch the DB to auto_vacuum=INCREMENTAL (runs a full VACUUM once).")
+def run_maintenance_command(jobs, enable_incremental_vacuum):
+    """Run maintenance jobs now: the named ones, or all of them."""
+    migrate_database()
+    known = [name for name, _, _ in MAINTENANCE_JOBS]
+    unknown = [name for name in jobs if name not in known]
+    if unknown:
+        raise click.BadParameter(f"unknown job(s): {', '.join(unknown)}; choose from {', '.join(known)}")
+    if enable_incremental_vacuum:
+        with db_pool.connection() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        print("auto_vacuum set to INCREMENTAL.")
+    results = maintenance.run_due(only=list(jobs) or known)
+    maintenance.release_lease()
+    if not results:
+        print("Another worker holds the maintenance lease; try again later.")
+    for name, result in results.items():
+        status = f"failed ({result['error']})" if result["error"] else f"{result['rows']} rows"
+        print(f"{name}: {status} in {result['duration_ms']} ms")
+
+
+# ---------------- GALLERY MANIFEST ----------------
+
+def _exif_orientation(app1):
+    # TIFF Orientation (tag 0x0112) from a JPEG APP1 payload; 1 when absent.
+    if app1[:6] != b"Exif\0\0":
+        return 1
+    tiff = app1[6:]
+    endian = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if endian is None:
+        return 1
+    ifd = struct.unpack(endian + "I", tiff[4:8])[0]
+    for i in range(struct.unpack(endian + "H", tiff[ifd:ifd + 2])[0]):
+        entry = tiff[ifd + 2 + 12 * i:ifd + 14 + 12 * i]
+        if struct.unpack(endian + "H", entry[:2])[0] == 0x0112:
+            return struct.unpack(endian + "H", entry[8:10])[0]
+    return 1
+
+
+def read_image_size(path):
+    # Parses just the header of PNG, GIF, WebP and JPEG files. JPEG sizes are
+    # reported after EXIF orientation, as browsers and exif_transpose see them.
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(32)
+            if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", head[6:10])
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                chunk = head[12:16]
+                if chunk == b"VP8 ":
+                    w, h = struct.unpack("<HH", head[26:30])
+                    return w & 0x3FFF, h & 0x3FFF
+                if chunk == b"VP8L":
+                    bits = int.from_bytes(head[21:25], "little")
+                    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                if chunk == b"VP8X":
+                    return (
+                        int.from_bytes(head[24:27], "little") + 1,
+                        int.from_bytes(head[27:30], "little") + 1,
+                    )
+            if head[:2] == b"\xff\xd8":
+                fh.seek(2)
+                orientation = 1
+                while True:
+                    marker = fh.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        break
+                    length = struct.unpack(">H", fh.read(2))[0]
+                    if marker[1] == 0xE1 and orientation == 1:
+                        orientation = _exif_orientation(fh.read(length - 2))
+                        continue
+                    if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                        h, w = struct.unpack(">xHH", fh.read(5))
+                        # Orientations 5-8 rotate by 90 degrees.
+                        return (h, w) if orientation in (5, 6, 7, 8) else (w, h)
+                    fh.seek(length - 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        pass
+    return None, None
+
+
+def variant_widths(original_width):
+    return [w for w in IMAGE_VARIANT_WIDTHS if original_width and w < original_width]
+
+
+def variant_name(name, digest, width, ext):
+    # Content hash in the name: a replaced original never serves stale variants.
+    return f"{name}.{digest[:10]}.{width}.{ext}"
+
+
+def fallback_ext(name):
+    ext = name.rsplit(".", 1)[1].lower()
+    return "png" if ext == "png" else "jpg"
+
+
+def build_image_variants(folder, name):
+    # Writes resized WebP and JPEG/PNG copies of one gallery image into
+    # `<folder>/_variants`. Returns the number of files written.
+    ext = name.rsplit(".", 1)[-1].lower()
+    if Image is None or ext not in GALLERY_EXTENSIONS or ext == "gif":
+        return 0
+    path = os.path.join(folder, name)
+    variants_dir = os.path.join(folder, VARIANTS_DIRNAME)
+    os.makedirs(variants_dir, exist_ok=True)
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(65536), b""):
+            digest.update(chunk)
+    digest = digest.hexdigest()
+
+    written = 0
+    with Image.open(path) as source:
+        image = ImageOps.exif_transpose(source)
+        keep_alpha = image.mode in ("RGBA", "LA", "P") and fallback_ext(name) == "png"
+        image = image.convert("RGBA" if keep_alpha else "RGB")
+        targets = [(w, "webp") for w in variant_widths(image.width)] + [(image.width, "webp")]
+        targets += [(w, fallback_ext(name)) for w in variant_widths(image.width)]
+
+        for width, ext in targets:
+            target = os.path.join(variants_dir, variant_name(name, digest, width, ext))
+            if os.path.exists(target):
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            tmp = f"{target}.tmp"
+            if ext == "webp":
+                resized.save(tmp, "WEBP", quality=80, method=4)
+            elif ext == "png":
+                resized.save(tmp, "PNG", optimize=True)
+            else:
+                resized.save(tmp, "JPEG", quality=82, optimize=True, progressive=True)
+            os.replace(tmp, target)
+            written += 1
+    return written
+
+
+def remove_image_variants(folder, name):
+    variants_dir = os.path.join(folder, VARIANTS_DIRNAME)
+    try:
+        names = os.listdir(variants_dir)
+    except FileNotFoundError:
+        return
+    for variant in names:
+        if variant.startswith(f"{name}."):
+            os.remove(os.path.join(variants_dir, variant))
+
+
+class GalleryManifest:
+    """Cached, sorted listing of one image folder with size, dimensions and hash."""
+
+    def __init__(self, folder, stat_interval=GALLERY_STAT_INTERVAL):
+        self.folder = folder
+        self.stat_interval = stat_interval
+        self._lock = threading.Lock()
+        self._entries = []
+        self._by_key = {}
+        self._dir_mtime = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._dir_mtime = None
+            self._checked_at = 0.0
+
+    def entries(self):
+        now = time.monotonic()
+        if self._dir_mtime is not None and now - self._checked_at < self.stat_interval:
+            return self._entries
+        with self._lock:
+            dir_mtime = tuple(
+                os.stat(path).st_mtime_ns if os.path.isdir(path) else -1
+                for path in (self.folder, os.path.join(self.folder, VARIANTS_DIRNAME))
+            )
+            if dir_mtime != self._dir_mtime:
+                self._rebuild()
+                self._dir_mtime = dir_mtime
+            self._checked_at = now
+            return self._entries
+
+    def _rebuild(self):
+        entries, by_key = [], {}
+        try:
+            scan = list(os.scandir(self.folder))
+        except FileNotFoundError:
+            scan = []
+        try:
+            variant_files = set(os.listdir(os.path.join(self.folder, VARIANTS_DIRNAME)))
+        except FileNotFoundError:
+            variant_files = set()
+        for item in scan:
+            name = item.name
+            if name.startswith(".") or not item.is_file():
+                continue
+            if "." not in name or name.rsplit(".", 1)[1].lower() not in GALLERY_EXTENSIONS:
+                continue
+            st = item.stat()
+            key = (name, st.st_size, st.st_mtime_ns)
+            # Unchanged files keep their hash and dimensions from the last build.
+            entry = self._by_key.get(key)
+            if entry is None:
+                width, height = read_image_size(item.path)
+                digest = hashlib.sha1()
+                with open(item.path, "rb") as fh:
+                    for chunk in iter(lambda: fh.read(65536), b""):
+                        digest.update(chunk)
+                entry = {
+                    "name": name,
+                    "size": st.st_size,
+                    "width": width,
+                    "height": height,
+                    "hash": digest.hexdigest(),
+                    "mtime": int(st.st_mtime),
+                }
+            by_key[key] = entry
+            entries.append({**entry, **self._variants(entry, variant_files)})
+        entries.sort(key=lambda e: (e["name"].casefold(), e["name"]))
+        self._entries, self._by_key = entries, by_key
+
+    @staticmethod
+    def _variants(entry, variant_files):
+        # Only widths whose file actually exists are advertised, so a partial
+        # backfill still yields a valid srcset.
+        name, digest, width = entry["name"], entry["hash"], entry["width"]
+        webp, fallback = [], []
+        for w in variant_widths(width) + [width]:
+            candidate = variant_name(name, digest, w, "webp")
+            if w and candidate in variant_files:
+                webp.append((w, f"{VARIANTS_DIRNAME}/{candidate}"))
+        if "." in name:
+            for w in variant_widths(width):
+                candidate = variant_name(name, digest, w, fallback_ext(name))
+                if candidate in variant_files:
+                    fallback.append((w, f"{VARIANTS_DIRNAME}/{candidate}"))
+        if fallback and width:
+            fallback.append((width, name))
+        return {"webp_srcset": webp, "srcset": fallback}
+
+
+_gallery_manifests = {}
+_gallery_lock = threading.Lock()
+
+
+def get_gallery(folder):
+    manifest = _gallery_manifests.get(folder)
+    if manifest is None:
+        with _gallery_lock:
+            manifest = _gallery_manifests.setdefault(folder, GalleryManifest(folder))
+    return manifest
+
+
+def save_gallery_upload(file, folder):
+    filename = secure_filename(file.filename)
+    file.save(os.path.join(folder, filename))
+    remove_image_variants(folder, filename)
+    try:
+        build_image_variants(folder, filename)
+    except Exception as exc:
+        # The original is still served; `flask build-image-variants` retries.
+        app.logger.warning("Could not build variants for %s: %s", filename, exc)
+    get_gallery(folder).invalidate()
+
+
+def delete_gallery_image(folder, filename):
+    path = os.path.join(folder, filename)
+    if not os.path.exists(path):
+        return False
+    os.remove(path)
+    remove_image_variants(folder, filename)
+    get_gallery(folder).invalidate()
+    return True
+
+
+@app.cli.command("build-image-variants")
+def build_image_variants_command():
+    """Backfill responsive variants for the home and design galleries."""
+    if Image is None:
+        print("Pillow is not installed; nothing to do.")
+        return
+    for folder in (HOME_FOLDER, DESIGN_FOLDER):
+        written = 0
+        for entry in get_gallery(folder).entries():
+            written += build_image_variants(folder, entry["name"])
+        get_gallery(folder).invalidate()
+        print(f"{folder}: {written} variant files written")
+
+
 # ---------------- PUBLIC PAGES ----------------
 
 @app.route("/robots.txt")
@@ -403,7 +2477,7 @@ def sitemap_xml():
 
 @app.route("/")
 def home():
-    home_images = os.listdir(HOME_FOLDER)
+    home_images = get_gallery(HOME_FOLDER).entries()
     return render_template(
         "home.html",
         home_images=home_images,
@@ -428,7 +2502,7 @@ def about():
 
 @app.route("/designs")
 def designs():
-    images = os.listdir(DESIGN_FOLDER)
+    images = get_gallery(DESIGN_FOLDER).entries()
     return render_template(
         "designs.html",
         images=images,
@@ -470,14 +2544,10 @@ def customer():
             filename = secure_filename(f"{name}_{file.filename}")
             file.save(os.path.join(CUSTOMER_FOLDER, filename))
 
-            track_id = generate_track_id("IF", "customer_submissions")
-            execute_query(
-                """
-                INSERT INTO customer_submissions (track_id, name, phone, image, message, time, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
+            track_id = insert_with_track_id(
+                "IF",
+                ("name", "phone", "image", "message", "time", "status"),
                 (
-                    track_id,
                     name,
                     phone,
                     filename,
@@ -507,6 +2577,84 @@ def customer():
 
 # ---------------- TRACK REQUEST ----------------
 
+# prefix -> (track type, lookup query); the prefix alone picks the table.
+TRACK_LOOKUPS = {
+    "IF": (
+        "customer",
+        "SELECT track_id, name, phone, image, message, time, status FROM customer_submissions WHERE track_id = ?",
+    ),
+    "EMP": (
+        "employee",
+        "SELECT track_id, name, phone, work_type, experience, salary_model, admin_note, resume_file, time, status FROM employee_requests WHERE track_id = ?",
+    ),
+}
+
+
+class TrackCache:
+    """LRU + TTL cache of found track lookups keyed by track ID."""
+
+    def __init__(self, max_size=TRACK_CACHE_SIZE, ttl=TRACK_CACHE_TTL):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # track_id -> ((track_type, row), expires_at)
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, track_id):
+        with self._lock:
+            entry = self._entries.get(track_id)
+            if entry is None or entry[1] <= time.time():
+                self._entries.pop(track_id, None)
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(track_id)
+            self._counters["hits"] += 1
+            return entry[0]
+
+    def put(self, track_id, value):
+        with self._lock:
+            self._entries[track_id] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(track_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, track_id):
+        with self._lock:
+            if self._entries.pop(track_id, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, **self._counters}
+
+
+track_cache = TrackCache()
+
+
+def lookup_track_id(track_id):
+    # Returns (track_type, row) or (None, None). Unknown IDs are not cached so
+    # a freshly issued ID is never reported missing.
+    track_id = track_id.strip().upper()
+    lookup = TRACK_LOOKUPS.get(track_id.split("-", 1)[0])
+    if not lookup:
+        return None, None
+    cached = track_cache.get(track_id)
+    if cached is not None:
+        return cached
+    track_type, query = lookup
+    row = fetch_one(query, (track_id,))
+    if not row:
+        return None, None
+    track_cache.put(track_id, (track_type, row))
+    return track_type, row
+
+
+def invalidate_track(table, row_id):
+    row = fetch_one(f"SELECT track_id FROM {table} WHERE id = ?", (row_id,))
+    if row:
+        track_cache.invalidate(row["track_id"])
+
+
 @app.route("/track", methods=["GET", "POST"])
 def track_request():
     result = None
@@ -514,23 +2662,7 @@ def track_request():
     track_type = None
 
     if request.method == "POST":
-        track_id = request.form.get("track_id", "").strip()
-
-        result = fetch_one(
-            "SELECT track_id, name, phone, image, message, time, status FROM customer_submissions WHERE track_id = ?",
-            (track_id,),
-        )
-        if result:
-            track_type = "customer"
-
-        if not result:
-            result = fetch_one(
-                "SELECT track_id, name, phone, work_type, experience, salary_model, admin_note, resume_file, time, status FROM employee_requests WHERE track_id = ?",
-                (track_id,),
-            )
-            if result:
-                track_type = "employee"
-
+        track_type, result = lookup_track_id(request.form.get("track_id", ""))
         if not result:
             error = "Invalid Track ID. Please check and try again."
 
@@ -546,6 +2678,14 @@ def track_request():
     )
 
 
+@app.route("/track/<track_id>/status")
+def track_status(track_id):
+    track_type, result = lookup_track_id(track_id)
+    if not result:
+        return {"error": "Invalid Track ID. Please check and try again."}, 404
+    return {"type": track_type, **result}
+
+
 # ---------------- CAREERS / EMPLOYEE APPLY ----------------
 
 @app.route("/careers", methods=["GET", "POST"])
@@ -598,15 +2738,13 @@ def careers():
             resume_filename = secure_filename(f"{phone}_resume_{resume_file.filename}")
             resume_file.save(os.path.join(EMPLOYEE_FOLDER, resume_filename))
 
-        track_id = generate_track_id("EMP", "employee_requests")
-        execute_query(
-            """
-            INSERT INTO employee_requests
-            (track_id, name, phone, aadhar, aadhar_file, resume_file, work_type, experience, message, status, salary_model, admin_note, time)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        track_id = insert_with_track_id(
+            "EMP",
+            (
+                "name", "phone", "aadhar", "aadhar_file", "resume_file", "work_type",
+                "experience", "message", "status", "salary_model", "admin_note", "time",
+            ),
             (
-                track_id,
                 name,
                 phone,
                 aadhar,
@@ -704,33 +2842,29 @@ def admin_dashboard():
         if "home_image" in request.files:
             file = request.files["home_image"]
             if file and allowed_file(file.filename):
-                file.save(os.path.join(HOME_FOLDER, secure_filename(file.filename)))
+                save_gallery_upload(file, HOME_FOLDER)
                 uploads_done.append("home gallery")
 
         if "design_image" in request.files:
             file = request.files["design_image"]
             if file and allowed_file(file.filename):
-                file.save(os.path.join(DESIGN_FOLDER, secure_filename(file.filename)))
+                save_gallery_upload(file, DESIGN_FOLDER)
                 uploads_done.append("design gallery")
         if uploads_done:
             flash(f"Upload successful: {', '.join(uploads_done)}.", "success")
 
-    home_images = os.listdir(HOME_FOLDER)
-    designs = os.listdir(DESIGN_FOLDER)
+    home_images = get_gallery(HOME_FOLDER).entries()
+    designs = get_gallery(DESIGN_FOLDER).entries()
 
-    customers = fetch_all(
-        """
-        SELECT id, track_id, name, phone, image, message, time, status
-        FROM customer_submissions
-        ORDER BY id DESC
-        """
+    customer_page = keyset_page(
+        "customer_submissions",
+        "id, track_id, name, phone, image, message, time, status",
+        "cust",
     )
-    employees = fetch_all(
-        """
-        SELECT id, track_id, name, phone, aadhar, aadhar_file, resume_file, work_type, experience, status, salary_model, admin_note, time
-        FROM employee_requests
-        ORDER BY id DESC
-        """
+    employee_page = keyset_page(
+        "employee_requests",
+        "id, track_id, name, phone, aadhar, aadhar_file, resume_file, work_type, experience, status, salary_model, admin_note, time",
+        "emp",
     )
     pending_tickets = fetch_all(
         """
@@ -740,46 +2874,139 @@ def admin_dashboard():
         ORDER BY updated_at DESC
         """
     )
+    ticket_messages = load_thread_messages([t["id"] for t in pending_tickets])
     for ticket in pending_tickets:
-        msgs = fetch_all(
-            """
-            SELECT id, sender, message, created_at
-            FROM chat_messages
-            WHERE thread_id = ?
-            ORDER BY id ASC
-            """,
-            (ticket["id"],),
-        )
+        msgs = ticket_messages[ticket["id"]]
         ticket["messages"] = msgs
         ticket["latest_question"] = msgs[-1]["message"] if msgs else ""
 
-    stats = {
-        "total_customers": len(customers),
-        "total_employees": len(employees),
-        "pending_customers": sum(1 for c in customers if c["status"] == "pending"),
-        "pending_employees": sum(1 for e in employees if e["status"] == "pending"),
-        "pending_tickets": len(pending_tickets),
-    }
+    stats = get_dashboard_stats()
 
     return render_template(
         "admin_dashboard.html",
         home_images=home_images,
         designs=designs,
-        customers=customers,
-        employees=employees,
+        customers=customer_page["rows"],
+        employees=employee_page["rows"],
+        customer_page=customer_page,
+        employee_page=employee_page,
+        dashboard_url=dashboard_url,
         pending_tickets=pending_tickets,
         stats=stats,
     )
 
 
+@app.route("/admin/stats")
+def admin_stats():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+    return get_dashboard_stats()
+
+
+# ---------------- ADMIN SEARCH ----------------
+
+# Submissions and applications are ranked by bm25. Chat hits come newest
+# first: FTS5 walks rowids in order and stops at LIMIT, where ranking a
+# common word would score every matching message in the transcript.
+SEARCH_QUERIES = {
+    "cust": """
+        SELECT c.id, c.track_id, c.name, c.phone, c.status, c.time,
+               snippet(customer_search, -1, char(2), char(3), '…', 12) AS snippet
+        FROM customer_search
+        JOIN customer_submissions c ON c.id = customer_search.rowid
+        WHERE customer_search MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """,
+    "emp": """
+        SELECT e.id, e.track_id, e.name, e.phone, e.work_type, e.status, e.time,
+               snippet(employee_search, -1, char(2), char(3), '…', 12) AS snippet
+        FROM employee_search
+        JOIN employee_requests e ON e.id = employee_search.rowid
+        WHERE employee_search MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """,
+    "chat": """
+        SELECT m.id, m.thread_id, m.sender, m.created_at, t.status,
+               snippet(chat_message_search, 0, char(2), char(3), '…', 12) AS snippet
+        FROM chat_message_search
+        JOIN chat_messages m ON m.id = chat_message_search.rowid
+        LEFT JOIN chat_threads t ON t.id = m.thread_id
+        WHERE chat_message_search MATCH ?
+        ORDER BY chat_message_search.rowid DESC
+        LIMIT ?
+    """,
+}
+
+
+def build_match_query(text):
+    # Every term must match, each as a prefix: "pri 98" finds "Priya", "9876...".
+    return " ".join(f'"{term}"*' for term in normalize_question(text).split())
+
+
+def snippet_html(snippet):
+    # snippet() marks hits with \x02/\x03; escape the stored text around them.
+    return str(escape(snippet or "")).replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
+def search_admin_records(text, scopes, limit):
+    match = build_match_query(text)
+    results = {}
+    for scope in scopes:
+        rows = fetch_all(SEARCH_QUERIES[scope], (match, limit))
+        for row in rows:
+            row["snippet"] = snippet_html(row["snippet"])
+        results[scope] = rows
+    return results
+
+
+@app.route("/admin/search")
+def admin_search():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+
+    text = request.args.get("q", "").strip()
+    scope = request.args.get("scope", "all").strip()
+    limit = request.args.get("limit", "").strip()
+    limit = min(int(limit), SEARCH_MAX_LIMIT) if limit.isdigit() and int(limit) > 0 else SEARCH_DEFAULT_LIMIT
+    if scope != "all" and scope not in SEARCH_INDEXES:
+        return {"error": f"Unknown scope. Use all or one of: {', '.join(SEARCH_INDEXES)}."}, 400
+    if not build_match_query(text):
+        return {"error": "Search text is required."}, 400
+
+    started = time.perf_counter()
+    try:
+        results = search_admin_records(text, list(SEARCH_INDEXES) if scope == "all" else [scope], limit)
+    except sqlite3.OperationalError:
+        app.logger.exception("Admin search failed")
+        return {"error": "Search index is not available."}, 503
+    return {
+        "query": text,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+@app.cli.command("rebuild-search-index")
+def rebuild_search_index_command():
+    """Create the full-text search tables if needed and re-index every row."""
+    migrate_database()
+    with transaction() as conn:
+        if not fts5_available(conn):
+            raise click.ClickException("This SQLite build has no FTS5 support.")
+        create_search_index(conn, rebuild=True)
+    for fts, table, _columns in SEARCH_INDEXES.values():
+        row = fetch_one(f"SELECT COUNT(*) AS c FROM {table}")
+        print(f"{fts}: {row['c']} rows indexed from {table}")
+
+
 @app.route("/admin/delete/<filename>")
 def delete_design(filename):
     if "admin" not in session:
         return redirect(url_for("admin_login"))
 
-    path = os.path.join(DESIGN_FOLDER, filename)
-    if os.path.exists(path):
-        os.remove(path)
+    delete_gallery_image(DESIGN_FOLDER, filename)
 
     return redirect(url_for("admin_dashboard"))
 
@@ -789,9 +3016,7 @@ def delete_home_image(filename):
     if "admin" not in session:
         return redirect(url_for("admin_login"))
 
-    path = os.path.join(HOME_FOLDER, filename)
-    if os.path.exists(path):
-        os.remove(path)
+    if delete_gallery_image(HOME_FOLDER, filename):
         flash("Home image deleted.", "success")
     else:
         flash("Image not found.", "error")
@@ -804,9 +3029,7 @@ def delete_design_image(filename):
     if "admin" not in session:
         return redirect(url_for("admin_login"))
 
-    path = os.path.join(DESIGN_FOLDER, filename)
-    if os.path.exists(path):
-        os.remove(path)
+    if delete_gallery_image(DESIGN_FOLDER, filename):
         flash("Design image deleted.", "success")
     else:
         flash("Image not found.", "error")
@@ -822,7 +3045,7 @@ def update_customer_status(submission_id, status):
         return redirect(url_for("admin_login"))
 
     submission = fetch_one(
-        "SELECT id FROM customer_submissions WHERE id = ?",
+        "SELECT id, track_id FROM customer_submissions WHERE id = ?",
         (submission_id,),
     )
     if not submission:
@@ -834,6 +3057,7 @@ def update_customer_status(submission_id, status):
             "UPDATE customer_submissions SET status = ? WHERE id = ?",
             (status, submission_id),
         )
+        track_cache.invalidate(submission["track_id"])
         status_text = {
             "approved": "approved",
             "rejected": "declined",
@@ -854,7 +3078,7 @@ def delete_customer_submission(submission_id):
         return redirect(url_for("admin_login"))
 
     submission = fetch_one(
-        "SELECT image FROM customer_submissions WHERE id = ?",
+        "SELECT image, track_id FROM customer_submissions WHERE id = ?",
         (submission_id,),
     )
 
@@ -866,6 +3090,7 @@ def delete_customer_submission(submission_id):
                 os.remove(img_path)
 
         execute_query("DELETE FROM customer_submissions WHERE id = ?", (submission_id,))
+        track_cache.invalidate(submission["track_id"])
         flash("Customer request deleted.", "success")
     else:
         flash("Customer request not found.", "error")
@@ -873,6 +3098,480 @@ def delete_customer_submission(submission_id):
     return redirect(url_for("admin_dashboard"))
 
 
+# ---------------- BULK ADMIN ACTIONS ----------------
+
+# target -> (table, actions); each action mirrors a single-row admin route.
+BULK_TARGETS = {
+    "cust": ("customer_submissions", REVIEW_STATUSES + ("delete",)),
+    "emp": ("employee_requests", REVIEW_STATUSES),
+}
+
+
+def _rows_by_id(conn, table, columns, ids):
+    rows = []
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows.extend(
+            dict(row) for row in conn.execute(
+                f"SELECT {columns} FROM {table} WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+        )
+    return rows
+
+
+def bulk_admin_action(target, action, ids):
+    table, _actions = BULK_TARGETS[target]
+    columns = "id, track_id, image" if action == "delete" else "id, track_id"
+    with transaction() as conn:
+        rows = _rows_by_id(conn, table, columns, ids)
+        images = set()
+        if action == "delete":
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(row["id"],) for row in rows])
+            # Uploads are named after the customer, so a file can be shared
+            # with a submission that is not being deleted.
+            images = {row["image"] for row in rows if row["image"]}
+            if images:
+                placeholders = ", ".join("?" for _ in images)
+                images -= {
+                    row["image"] for row in conn.execute(
+                        f"SELECT image FROM {table} WHERE image IN ({placeholders})", list(images)
+                    ).fetchall()
+                }
+        else:
+            conn.executemany(
+                f"UPDATE {table} SET status = ? WHERE id = ?", [(action, row["id"]) for row in rows]
+            )
+    # Files go only after the rows are gone, so a failed commit keeps both.
+    for row in rows:
+        track_cache.invalidate(row["track_id"])
+    files_removed = 0
+    for image in images:
+        try:
+            os.remove(os.path.join(CUSTOMER_FOLDER, image))
+            files_removed += 1
+        except FileNotFoundError:
+            pass
+    found = {row["id"] for row in rows}
+    return {
+        "updated": len(rows),
+        "missing": [row_id for row_id in ids if row_id not in found],
+        "files_removed": files_removed,
+    }
+
+
+@app.route("/admin/bulk", methods=["POST"])
+def admin_bulk_action():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+
+    payload = request.get_json(silent=True) or {}
+    target = payload.get("target")
+    action = payload.get("action")
+    ids = payload.get("ids")
+    if target not in BULK_TARGETS:
+        return {"error": f"target must be one of: {', '.join(BULK_TARGETS)}."}, 400
+    if action not in BULK_TARGETS[target][1]:
+        return {"error": f"action must be one of: {', '.join(BULK_TARGETS[target][1])}."}, 400
+    if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+        return {"error": "ids must be a non-empty list of integers."}, 400
+    if len(ids) > BULK_MAX_IDS:
+        return {"error": f"At most {BULK_MAX_IDS} ids per request."}, 400
+
+    started = time.perf_counter()
+    ids = list(dict.fromkeys(ids))
+    summary = bulk_admin_action(target, action, ids)
+    return {
+        "target": target,
+        "action": action,
+        "requested": len(ids),
+        **summary,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+# ---------------- ADMIN EXPORTS ----------------
+
+# dataset -> (select, date column, status column, statuses, order column).
+# Aadhaar numbers and document file names are deliberately left out.
+EXPORT_DATASETS = {
+    "customers": (
+        "SELECT id, track_id, name, phone, image, message, time, status FROM customer_submissions",
+        "time", "status", REVIEW_STATUSES, "id",
+    ),
+    "employees": (
+        """
+        SELECT id, track_id, name, phone, work_type, experience, message, status,
+               salary_model, admin_note, time
+        FROM employee_requests
+        """,
+        "time", "status", REVIEW_STATUSES, "id",
+    ),
+    "chats": (
+        """
+        SELECT m.id, m.thread_id, t.status AS thread_status, t.category, m.sender, m.message, m.created_at
+        FROM chat_messages m
+        JOIN chat_threads t ON t.id = m.thread_id
+        """,
+        "m.created_at", "t.status", ("open", "closed"), "m.id",
+    ),
+}
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+def csv_safe(value):
+    # Spreadsheets run cells starting with = + - @ as formulas (and "-1+cmd|"
+    # style payloads too), so every such string is quoted. Stored phones are
+    # digits only and never need the exemption.
+    if isinstance(value, str) and value.startswith(("=", "+", "-", "@", "\t", "\r")):
+        return "'" + value
+    return value
+
+
+def export_chunks(query, params, fmt):
+    # Rows stream from one cursor and leave as EXPORT_CHUNK_ROWS-row chunks;
+    # memory stays flat no matter how many rows the export covers.
+    rows = iter_rows(query, params, row_type="tuple", arraysize=EXPORT_CHUNK_ROWS, header=True)
+    try:
+        columns = next(rows)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+        for count, row in enumerate(rows, 1):
+            if fmt == "csv":
+                writer.writerow([csv_safe(value) for value in row])
+            else:
+                buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+            if count % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        rows.close()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode("utf-8"))
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        chunks.close()
+
+
+@app.route("/admin/export/<dataset>")
+def admin_export(dataset):
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+    if dataset not in EXPORT_DATASETS:
+        return {"error": f"Unknown dataset. Use one of: {', '.join(EXPORT_DATASETS)}."}, 404
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return {"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}."}, 400
+
+    base_sql, date_column, status_column, statuses, order_column = EXPORT_DATASETS[dataset]
+    where, params = [], []
+    status = request.args.get("status", "")
+    if status:
+        if status not in statuses:
+            return {"error": f"status must be one of: {', '.join(statuses)}."}, 400
+        where.append(f"{status_column} = ?")
+        params.append(status)
+    date_from = parse_date_arg(request.args.get("from"))
+    if date_from:
+        where.append(f"{date_column} >= ?")
+        params.append(date_from.isoformat())
+    date_to = parse_date_arg(request.args.get("to"))
+    if date_to:
+        where.append(f"{date_column} < ?")
+        params.append((date_to + timedelta(days=1)).isoformat())
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    query = f"{base_sql} {where_sql} ORDER BY {order_column}"
+
+    filename = f"{dataset}-{datetime.now():%Y%m%d}.{fmt}"
+    body = export_chunks(query, params, fmt)
+    mimetype = EXPORT_FORMATS[fmt]
+    if request.args.get("gzip") == "1":
+        body = gzip_chunks(body)
+        filename += ".gz"
+        mimetype = "application/gzip"
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
+
+
+# ---------------- DATA IMPORT ----------------
+
+# Columns restored for the request tables: exactly what /admin/export writes,
+# so an export re-imports cleanly and never blanks columns it left out.
+IMPORT_REQUEST_COLUMNS = {
+    "customers": ("customer_submissions", "IF", ("id", "track_id", "name", "phone", "image", "message", "time", "status")),
+    "employees": ("employee_requests", "EMP", (
+        "id", "track_id", "name", "phone", "work_type", "experience", "message", "status",
+        "salary_model", "admin_note", "time",
+    )),
+}
+CHAT_SENDERS = ("user", "admin")
+CHAT_THREAD_STATUSES = ("open", "closed")
+
+
+def _upsert_sql(table, columns):
+    updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col != "id")
+    placeholders = ", ".join("?" for _ in columns)
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) ON CONFLICT (id) DO UPDATE SET {updates}"
+
+
+def _require(condition, message):
+    if not condition:
+        raise ValueError(message)
+
+
+def _require_scalar(field, value):
+    # SQLite only binds scalars; a nested object would abort the whole batch.
+    _require(value is None or isinstance(value, (str, int, float)), f"{field} must be a string, number or null")
+
+
+def _prepare_request(dataset, record):
+    _table, prefix, columns = IMPORT_REQUEST_COLUMNS[dataset]
+    _require(type(record.get("id")) is int and record["id"] > 0, "id must be a positive integer")
+    track_id = record.get("track_id")
+    _require(isinstance(track_id, str) and track_id.startswith(f"{prefix}-"), f"track_id must start with {prefix}-")
+    record = {**record, "status": record.get("status") or "pending"}
+    _require(record["status"] in REVIEW_STATUSES, f"status must be one of: {', '.join(REVIEW_STATUSES)}")
+    for col in columns:
+        _require_scalar(col, record.get(col))
+    return tuple(record.get(col, "") for col in columns)
+
+
+def _write_requests(dataset):
+    table, _prefix, columns = IMPORT_REQUEST_COLUMNS[dataset]
+    sql = _upsert_sql(table, columns)
+    return lambda conn, rows: conn.executemany(sql, rows)
+
+
+def _prepare_message(message, thread_id):
+    _require(isinstance(message, dict), "message must be a JSON object")
+    _require(type(message.get("id")) is int and message["id"] > 0, "message id must be a positive integer")
+    _require(message.get("sender") in CHAT_SENDERS, f"sender must be one of: {', '.join(CHAT_SENDERS)}")
+    _require(isinstance(message.get("message"), str) and message["message"], "message text is required")
+    _require(isinstance(message.get("created_at"), str), "created_at is required")
+    return (message["id"], thread_id, message["sender"], message["message"], message["created_at"])
+
+
+def _prepare_thread(status, category):
+    _require(status in CHAT_THREAD_STATUSES, f"thread status must be one of: {', '.join(CHAT_THREAD_STATUSES)}")
+    _require_scalar("category", category)
+    return category or "general"
+
+
+# Threads widen to cover every imported message; an open thread only closes
+# if the dump says so.
+THREAD_UPSERT_SQL = """
+    INSERT INTO chat_threads (id, status, category, created_at, updated_at, client_key)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        status = excluded.status,
+        category = excluded.category,
+        created_at = MIN(created_at, excluded.created_at),
+        updated_at = MAX(updated_at, excluded.updated_at)
+"""
+MESSAGE_UPSERT_SQL = _upsert_sql("chat_messages", ("id", "thread_id", "sender", "message", "created_at"))
+
+
+def _prepare_chat_row(record):
+    # One /admin/export/chats row: a message plus its thread's status.
+    thread_id = record.get("thread_id")
+    _require(isinstance(thread_id, str) and thread_id, "thread_id is required")
+    category = _prepare_thread(record.get("thread_status"), record.get("category"))
+    message = _prepare_message(record, thread_id)
+    created_at = message[4]
+    return (thread_id, record["thread_status"], category, created_at, created_at, None), [message]
+
+
+def _prepare_archived_thread(record):
+    # One archive_closed_threads line: a thread with all of its messages.
+    _require(isinstance(record.get("id"), str) and record["id"], "id is required")
+    category = _prepare_thread(record.get("status"), record.get("category"))
+    _require(isinstance(record.get("created_at"), str) and isinstance(record.get("updated_at"), str),
+             "created_at and updated_at are required")
+    _require_scalar("client_key", record.get("client_key"))
+    messages = record.get("messages") or []
+    _require(isinstance(messages, list), "messages must be a list")
+    thread = (record["id"], record["status"], category, record["created_at"], record["updated_at"], record.get("client_key"))
+    return thread, [_prepare_message(message, record["id"]) for message in messages]
+
+
+def _write_threads(conn, rows):
+    conn.executemany(THREAD_UPSERT_SQL, [thread for thread, _messages in rows])
+    conn.executemany(MESSAGE_UPSERT_SQL, [message for _thread, messages in rows for message in messages])
+
+
+def _prepare_legacy_chat(record):
+    # chat_messages.json predates threads: pending {id, question} and
+    # answered {id, question, reply}. Each becomes a thread so the dashboard
+    # and tracking see it.
+    _require(isinstance(record.get("id"), str) and record["id"], "id is required")
+    _require(isinstance(record.get("question"), str) and record["question"], "question is required")
+    if record["kind"] == "answered":
+        _require(isinstance(record.get("reply"), str), "reply is required for answered entries")
+    return (record["kind"], record["id"], record["question"], record.get("reply"))
+
+
+def _write_legacy_chat(conn, rows):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    pending = [(tid, question) for kind, tid, question, _reply in rows if kind == "pending"]
+    answered = [(tid, question, reply) for kind, tid, question, reply in rows if kind == "answered"]
+    conn.executemany("INSERT OR REPLACE INTO chat_pending (id, question) VALUES (?, ?)", pending)
+    conn.executemany("INSERT OR REPLACE INTO chat_answered (id, question, reply) VALUES (?, ?, ?)", answered)
+    conn.executemany(
+        """
+        INSERT INTO chat_threads (id, status, category, created_at, updated_at)
+        VALUES (?, ?, 'general', ?, ?)
+        ON CONFLICT (id) DO NOTHING
+        """,
+        [(tid, "open" if kind == "pending" else "closed", now, now) for kind, tid, _q, _r in rows],
+    )
+    messages = [(tid, "user", question) for kind, tid, question, _reply in rows]
+    messages += [(tid, "admin", reply) for tid, _question, reply in answered if reply]
+    # Messages carry no id in the legacy file; skip ones already present.
+    conn.executemany(
+        """
+        INSERT INTO chat_messages (thread_id, sender, message, created_at)
+        SELECT ?1, ?2, ?3, ?4
+        WHERE NOT EXISTS (
+            SELECT 1 FROM chat_messages WHERE thread_id = ?1 AND sender = ?2 AND message = ?3
+        )
+        """,
+        [(tid, sender, text, now) for tid, sender, text in messages],
+    )
+
+
+# dataset -> (prepare(record) -> row, write(conn, rows))
+IMPORT_DATASETS = {
+    "customers": (lambda record: _prepare_request("customers", record), _write_requests("customers")),
+    "employees": (lambda record: _prepare_request("employees", record), _write_requests("employees")),
+    "chats": (_prepare_chat_row, _write_threads),
+    "threads": (_prepare_archived_thread, _write_threads),
+    "legacy-chat": (_prepare_legacy_chat, _write_legacy_chat),
+}
+
+
+def read_import_records(path, dataset):
+    # Yields (location, record). JSONL (optionally .gz) streams line by line;
+    # the legacy chat file is a single small JSON document.
+    if dataset == "legacy-chat":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        for kind in ("pending", "answered"):
+            for index, item in enumerate(data.get(kind) or []):
+                yield f"{kind}[{index}]", {**item, "kind": kind} if isinstance(item, dict) else item
+        return
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, 1):
+            if line.strip():
+                try:
+                    yield f"line {line_no}", json.loads(line)
+                except ValueError:
+                    yield f"line {line_no}", None
+
+
+def sync_track_id_sequences(conn):
+    # Imported IDs may be ahead of the allocator; never move a sequence back.
+    for prefix, table in TRACK_ID_TABLES.items():
+        day_start = len(prefix) + 2
+        conn.execute(
+            f"""
+            INSERT INTO track_id_sequences (prefix, day, last_value)
+            SELECT ?, substr(track_id, {day_start}, 6), MAX(CAST(substr(track_id, {day_start + 7}) AS INTEGER))
+            FROM {table}
+            WHERE track_id GLOB ?
+            GROUP BY substr(track_id, {day_start}, 6)
+            ON CONFLICT (prefix, day) DO UPDATE SET last_value = MAX(last_value, excluded.last_value)
+            """,
+            (prefix, f"{prefix}-[0-9][0-9][0-9][0-9][0-9][0-9]-[0-9]*"),
+        )
+
+
+def import_records(dataset, records, batch_size=IMPORT_BATCH_SIZE):
+    # Every write is an upsert, so re-running an import is a no-op and a batch
+    # that hits a constraint can be replayed row by row to isolate the bad rows.
+    prepare, write = IMPORT_DATASETS[dataset]
+    report = {"read": 0, "imported": 0, "rejected": 0, "errors": []}
+    batch = []
+
+    def reject(location, reason):
+        report["rejected"] += 1
+        if len(report["errors"]) < 20:
+            report["errors"].append(f"{location}: {reason}")
+
+    def flush():
+        with transaction() as conn:
+            try:
+                write(conn, [row for _location, row in batch])
+                report["imported"] += len(batch)
+            except sqlite3.Error:
+                for location, row in batch:
+                    try:
+                        write(conn, [row])
+                        report["imported"] += 1
+                    except sqlite3.Error as exc:
+                        reject(location, exc)
+        batch.clear()
+
+    started = time.perf_counter()
+    for location, record in records:
+        report["read"] += 1
+        if not isinstance(record, dict):
+            reject(location, "not a JSON object")
+            continue
+        try:
+            batch.append((location, prepare(record)))
+        except ValueError as exc:
+            reject(location, exc)
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    if dataset in ("customers", "employees"):
+        with transaction() as conn:
+            sync_track_id_sequences(conn)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    report["per_second"] = round(report["imported"] / report["seconds"]) if report["seconds"] else report["imported"]
+    return report
+
+
+@app.cli.command("import-data")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dataset", type=click.Choice(list(IMPORT_DATASETS)),
+              help="Record format; defaults to legacy-chat for .json files.")
+@click.option("--batch-size", default=IMPORT_BATCH_SIZE, show_default=True, help="Records per transaction.")
+def import_data_command(path, dataset, batch_size):
+    """Idempotently load a JSONL dump (export/archive format) or chat_messages.json."""
+    if dataset is None:
+        if not path.endswith(".json"):
+            raise click.UsageError("--dataset is required for JSONL files.")
+        dataset = "legacy-chat"
+    migrate_database()
+    report = import_records(dataset, read_import_records(path, dataset), max(1, batch_size))
+    print(
+        f"{dataset}: {report['imported']} imported, {report['rejected']} rejected "
+        f"of {report['read']} read in {report['seconds']}s ({report['per_second']} records/s)"
+    )
+    for error in report["errors"]:
+        print(f"  rejected {error}")
+
+
 # ---------------- EMPLOYEE STATUS UPDATE ----------------
 
 @app.route("/admin/employee/status/<int:employee_id>/<status>", methods=["POST"])
@@ -881,7 +3580,7 @@ def update_employee_status(employee_id, status):
         return redirect(url_for("admin_login"))
 
     employee = fetch_one(
-        "SELECT id FROM employee_requests WHERE id = ?",
+        "SELECT id, track_id FROM employee_requests WHERE id = ?",
         (employee_id,),
     )
     if not employee:
@@ -893,6 +3592,7 @@ def update_employee_status(employee_id, status):
             "UPDATE employee_requests SET status = ? WHERE id = ?",
             (status, employee_id),
         )
+        track_cache.invalidate(employee["track_id"])
         status_text = {
             "approved": "approved",
             "rejected": "declined",
@@ -919,6 +3619,7 @@ def update_employee_note(employee_id):
         "UPDATE employee_requests SET salary_model = ?, admin_note = ? WHERE id = ?",
         (salary_model, admin_note, employee_id),
     )
+    invalidate_track("employee_requests", employee_id)
     flash("Compensation model and internal notes updated.", "success")
 
     return redirect(url_for("admin_dashboard"))
@@ -936,80 +3637,54 @@ def chat():
             "ai_disabled": True,
         }
 
-    api_key = os.getenv("AIPIPE_TOKEN")
-
-    if "chat_history" not in session:
-        session["chat_history"] = []
-    session["chat_history"].append({"role": "user", "text": user_msg})
+    # History lives server-side; drop the list older cookies still carry.
+    session.pop("chat_history", None)
+    client_key = session.setdefault("chat_client", uuid.uuid4().hex[:16])
+    history = conversations.history(client_key)
+    conversations.append(client_key, "user", user_msg)
+
+    # Only stand-alone questions are cached, so only they may be answered from
+    # it; "yes" or "how much?" mean something different mid-conversation.
+    cached = answer_cache.get(user_msg) if not history else None
+    if cached is not None:
+        conversations.append(client_key, "assistant", cached)
+        return {"reply": cached, "admin": False, "cached": True}
+
+    if ai_breaker.state() == "open":
+        # Upstream is known to be down: skip the call and its timeout.
+        return chat_fallback(user_msg, client_key)
+
+    if AI_CHAT_MODE == "offload":
+        job_id = submit_chat_job(user_msg, client_key, history)
+        if job_id:
+            return {"job_id": job_id, "status": "pending", "admin": False}, 202
+        # Queue full: hand straight over to a human instead of stalling.
+        return chat_fallback(user_msg, client_key)
 
     try:
-        url = "https://aipipe.org/openrouter/v1/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
-
-        system_instruction = """
-            You are the official AI assistant for I.F Fashion.
-
-            About the company:
-            - We provide custom fashion design services.
-            - Customers can upload their own design ideas and images.
-            - Our team reviews submissions and creates tailored fashion products.
-            - Users receive a tracking ID to track their request status.
-            - We also hire employees through the careers section.
-
-            How the website works:
-            1. Customer uploads design via the website.
-            2. Admin reviews and approves/rejects the request.
-            3. Work starts after approval.
-            4. Customer can track status using tracking ID.
-
-            Customer Help:
-            - If user wants help, guide them step-by-step.
-            - If they ask about contact, provide this:
-
-            Contact Page:
-            /customer_contact
-
-            - Tell users they can reach out via the contact form for support.
-
-            Admin Assistance:
-            - If the AI cannot solve something, inform the user:
-            "I will connect you to a human assistant."
-            - Explain that their query will be forwarded to admin support.
-
-            Your behavior:
-            - Answer ONLY based on I.F Fashion services.
-            - Be clear, helpful, and slightly conversational.
-            - Always guide users on what to do next.
-            - If question is unrelated, politely say you only assist with this website.
-            """
-
-        payload = {
-            "model": "openai/gpt-4.1-nano",
-            "messages": [
-                {"role": "system", "content": system_instruction},
-                {"role": "user", "content": user_msg}
-            ]
-        }
-
-        response = requests.post(url, headers=headers, json=payload, timeout=15)
-
-        if response.status_code == 200:
-            res_data = response.json()
-            reply = res_data["choices"][0]["message"]["content"].strip()
-            return {"reply": reply, "admin": False}
-
-        raise Exception("AI Response Failed")
-
+        reply = ask_ai_assistant(user_msg, history)
     except Exception:
-        ticket_id = create_support_ticket(user_msg)
-        return {
-            "reply": "I'm connecting you to a human assistant. One moment...",
-            "admin": True,
-            "ticket_id": ticket_id
-        }
+        return chat_fallback(user_msg, client_key)
+    conversations.append(client_key, "assistant", reply)
+    return {"reply": reply, "admin": False}
+
+
+@app.route("/chat/jobs/<job_id>")
+def chat_job_status(job_id):
+    wait = request.args.get("wait", "0").strip()
+    wait = min(int(wait), CHAT_LONG_POLL_SECONDS) if wait.isdigit() else 0
+    with long_poll_slot(wait) as wait:
+        job = wait_for_chat_job(job_id, wait)
+    if not job:
+        return {"error": "Chat job not found."}, 404
+    result = {"job_id": job["id"], "status": job["status"], "long_poll": wait > 0}
+    if job["status"] == "failed":
+        result["error"] = "The assistant could not answer. Please open a support ticket."
+    if job["status"] == "done":
+        result.update({"reply": job["reply"], "admin": bool(job["admin"])})
+        if job["ticket_id"]:
+            result["ticket_id"] = job["ticket_id"]
+    return result
 
 
 @app.route("/chat/ticket", methods=["POST"])
@@ -1056,11 +3731,7 @@ def add_manual_ticket_message():
     if thread["status"] != "open":
         return {"error": "This ticket is closed."}, 400
 
-    add_chat_message(ticket_id, "user", message)
-    execute_query(
-        "INSERT OR REPLACE INTO chat_pending (id, question) VALUES (?, ?)",
-        (ticket_id, message),
-    )
+    add_customer_message(ticket_id, message)
     return {"ok": True}
 
 
@@ -1069,11 +3740,13 @@ def get_ticket_messages(ticket_id):
     after_id = request.args.get("after_id", "0").strip()
     if not after_id.isdigit():
         after_id = "0"
-    thread = fetch_one("SELECT id, status FROM chat_threads WHERE id = ?", (ticket_id,))
+    wait = request.args.get("wait", "0").strip()
+    wait = min(int(wait), CHAT_LONG_POLL_SECONDS) if wait.isdigit() else 0
+    with long_poll_slot(wait) as wait:
+        thread, msgs = wait_for_chat_messages(ticket_id, int(after_id), wait)
     if not thread:
         return {"error": "Ticket not found."}, 404
-    msgs = get_chat_messages(ticket_id, int(after_id))
-    return {"messages": msgs, "status": thread["status"]}
+    return {"messages": msgs, "status": thread["status"], "long_poll": wait > 0}
 
 
 # ---------------- CHECK ADMIN REPLY ----------------
@@ -1126,15 +3799,48 @@ def admin_chat_close(ticket_id):
         flash("Ticket already closed.", "error")
         return redirect(url_for("admin_dashboard"))
 
-    execute_query(
-        "UPDATE chat_threads SET status = 'closed', updated_at = ? WHERE id = ?",
-        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), ticket_id),
-    )
-    execute_query("DELETE FROM chat_pending WHERE id = ?", (ticket_id,))
+    close_chat_thread(ticket_id)
     flash("Ticket closed successfully.", "success")
     return redirect(url_for("admin_dashboard"))
 
 
+# ---------------- ADMIN DB STATS ----------------
+
+@app.route("/admin/db/pool")
+def admin_db_pool_stats():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+    return db_pool.stats()
+
+
+@app.route("/admin/maintenance")
+def admin_maintenance_stats():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+    return maintenance.stats()
+
+
+@app.route("/admin/chat/history")
+def admin_chat_history_stats():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+    return conversations.stats()
+
+
+@app.route("/admin/chat/breaker")
+def admin_ai_breaker_stats():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+    return ai_breaker.stats()
+
+
+@app.route("/admin/chat/cache")
+def admin_answer_cache_stats():
+    if "admin" not in session:
+        return {"error": "Admin login required."}, 401
+    return answer_cache.stats()
+
+
 # ---------------- LOGOUT ----------------
 
 @app.route("/logout")
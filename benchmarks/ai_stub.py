@@ -0,0 +1,79 @@
+"""Local stand-in for the AI chat upstream.
+
+Speaks just enough of the OpenAI chat-completions format for /chat, with
+injectable latency and failures, so the chat path can be load-tested without
+calling (or paying for) the real endpoint.
+
+    python benchmarks/ai_stub.py --port 8765 --delay 2 --fail-rate 0.2
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, delay=0.0, fail_rate=0.0, status=503):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.status = status
+        self.calls = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with state.lock:
+                state.calls += 1
+            time.sleep(state.delay)
+            if random.random() < state.fail_rate:
+                payload, status = {"error": "injected failure"}, state.status
+            else:
+                question = body.get("messages", [{}])[-1].get("content", "")
+                payload = {"choices": [{"message": {"content": f"stub answer to: {question}"}}]}
+                status = 200
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *_args):
+            pass
+
+    return Handler
+
+
+def start_stub(port=0, **kwargs):
+    state = StubState(**kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=2.0, help="seconds before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of calls that fail")
+    args = parser.parse_args()
+    server, _state, url = start_stub(args.port, delay=args.delay, fail_rate=args.fail_rate)
+    print(f"AI stub listening on {url} (AI_CHAT_URL)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""AnswerCache lookups: wrong-answer guards and miss latency with a full cache.
+
+Caches a few stand-alone answers, then checks that questions differing in a
+day, a number or a negation never get each other's reply, with fuzzy lookup
+off (the default) and on. Also times a miss against N cached entries in both
+modes. Exits non-zero if a guard fails.
+
+    python benchmarks/answer_cache.py --entries 2000
+"""
+
+import argparse
+import sys
+
+from common import load_app, time_ms
+
+CACHED = {
+    "Are you open on Sunday?": "Yes, 10am-4pm on Sunday.",
+    "What is the price for 100 pieces": "Rs 5000 for 100 pieces.",
+    "Can I cancel my order?": "Yes, before work starts.",
+}
+# question -> cached question whose reply it must (or may) get, or None
+PROBES = {
+    "Are you open on Monday?": None,
+    "What is the price for 500 pieces": None,
+    "Can't I cancel my order?": None,
+    "are you open on sunday??": "Are you open on Sunday?",
+}
+FUZZY_ONLY = {"Are you open Sunday?": "Are you open on Sunday?"}
+
+
+def check(app_module, cutoff, entries):
+    cache = app_module.AnswerCache(max_size=entries + len(CACHED), fuzzy_cutoff=cutoff)
+    for i in range(entries):
+        cache.put(f"filler question number {i} about embroidery orders", f"filler {i}")
+    for question, reply in CACHED.items():
+        cache.put(question, reply)
+    probes = {**PROBES, **(FUZZY_ONLY if cutoff > 0 else {})}
+    failures = []
+    for question, source in probes.items():
+        got = cache.get(question)
+        want = CACHED[source] if source else None
+        if got != want:
+            failures.append(f"cutoff {cutoff}: {question!r} got {got!r}, want {want!r}")
+    miss_ms = time_ms(lambda: cache.get("Do you ship to Dubai by courier?"), repeat=20)
+    return failures, miss_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    args = parser.parse_args()
+
+    app_module = load_app()
+    failures = []
+    print(f"{'fuzzy cutoff':>12} {'entries':>8} {'miss ms':>8}")
+    for cutoff in (0.0, 0.9):
+        found, miss_ms = check(app_module, cutoff, args.entries)
+        failures += found
+        print(f"{cutoff:>12} {args.entries:>8} {miss_ms:>8.2f}")
+    for failure in failures:
+        print(f"WRONG ANSWER {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
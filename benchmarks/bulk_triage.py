@@ -0,0 +1,53 @@
+"""Admin triage of N submissions: one POST per row versus /admin/bulk.
+
+The single-row routes redirect to /admin/dashboard, so the per-row path is
+timed as the POST plus the dashboard reload a browser follows it with.
+
+    python benchmarks/bulk_triage.py --rows 200
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from common import admin_client, load_app
+
+
+def seed_submissions(app_module, count):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with app_module.transaction() as conn:
+        conn.execute("DELETE FROM customer_submissions")
+        conn.executemany(
+            "INSERT INTO customer_submissions (track_id, name, phone, message, time, status) VALUES (?, ?, ?, ?, ?, 'pending')",
+            [(f"IF-000000-{i:05d}", f"Customer {i}", "9876543210", "triage", now) for i in range(count)],
+        )
+    return [row["id"] for row in app_module.fetch_all("SELECT id FROM customer_submissions ORDER BY id")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    args = parser.parse_args()
+
+    app_module = load_app()
+    client = admin_client(app_module)
+
+    ids = seed_submissions(app_module, args.rows)
+    started = time.perf_counter()
+    for row_id in ids:
+        client.post(f"/admin/customer/status/{row_id}/approved", follow_redirects=True)
+    single = (time.perf_counter() - started) * 1000
+
+    ids = seed_submissions(app_module, args.rows)
+    started = time.perf_counter()
+    summary = client.post("/admin/bulk", json={"target": "cust", "action": "approved", "ids": ids}).get_json()
+    client.get("/admin/dashboard")
+    bulk = (time.perf_counter() - started) * 1000
+
+    assert summary["updated"] == args.rows
+    print(f"{'rows':>6} {'per-row ms':>11} {'bulk ms':>9} {'speedup':>8}")
+    print(f"{args.rows:>6} {single:>11.1f} {bulk:>9.1f} {single / bulk:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
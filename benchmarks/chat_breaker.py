@@ -0,0 +1,70 @@
+"""AI outage behaviour: circuit breaker and ticket coalescing on /chat.
+
+Points the app at benchmarks/ai_stub.py with every call failing, then has a
+few browsers send several messages each. Without the breaker every message
+waits on the upstream and opens its own ticket; with it the upstream sees a
+handful of calls and each browser ends up with one open ticket. The stub is
+then healed and, after the cooldown, the half-open probe closes the breaker.
+
+    python benchmarks/chat_breaker.py --clients 4 --messages 10 --delay 0.5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from ai_stub import start_stub
+
+
+def send(client, text):
+    started = time.perf_counter()
+    data = client.post("/chat", json={"message": text}).get_json()
+    if "job_id" in data:
+        while data.get("status") != "done":
+            data = client.get(f"/chat/jobs/{data['job_id']}?wait=10").get_json()
+    return data, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--cooldown", type=float, default=2.0)
+    args = parser.parse_args()
+
+    _server, state, url = start_stub(delay=args.delay, fail_rate=1.0)
+    os.environ["ENABLE_AI_CHAT"] = "1"
+    os.environ["AI_CHAT_URL"] = url
+    os.environ["AI_BREAKER_COOLDOWN"] = str(args.cooldown)
+    from common import load_app
+
+    app_module = load_app()
+    clients = [app_module.app.test_client() for _ in range(args.clients)]
+    latencies = []
+    for i in range(args.messages):
+        for n, client in enumerate(clients):
+            # Distinct text per message so the answer cache never short-circuits.
+            _data, ms = send(client, f"client {n} outage question {i}")
+            latencies.append(ms)
+
+    with app_module.db_pool.connection() as conn:
+        tickets = conn.execute("SELECT COUNT(*) FROM chat_threads").fetchone()[0]
+    sent = args.clients * args.messages
+    print(f"messages sent:     {sent}")
+    print(f"upstream calls:    {state.calls}")
+    print(f"tickets opened:    {tickets} (clients: {args.clients})")
+    print(f"first reply ms:    {latencies[0]:.1f}")
+    print(f"last reply ms:     {latencies[-1]:.1f}")
+    print(f"breaker:           {app_module.ai_breaker.stats()}")
+
+    state.fail_rate = 0.0
+    time.sleep(args.cooldown)
+    data, _ms = send(clients[0], "is the assistant back?")
+    print(f"after recovery:    admin={data.get('admin')} breaker={app_module.ai_breaker.state()}")
+    sys.exit(0 if state.calls < sent and tickets == args.clients else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""/chat latency against a slow AI upstream, inline versus offloaded.
+
+Starts benchmarks/ai_stub.py with injected latency and fires concurrent /chat
+requests. In "sync" mode every request holds its thread for the full upstream
+delay; in "offload" mode /chat returns a job id at once and the reply is
+collected from /chat/jobs/<id>.
+
+    python benchmarks/chat_offload.py --delay 2 --clients 16
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_stub import start_stub
+
+
+def run(app_module, mode, clients):
+    app_module.AI_CHAT_MODE = mode
+
+    def one(i):
+        client = app_module.app.test_client()
+        started = time.perf_counter()
+        # Distinct text per mode: a repeat would be served by the answer cache
+        # and never reach the upstream or the executor.
+        res = client.post("/chat", json={"message": f"{mode} question {i}"})
+        accepted = time.perf_counter() - started
+        data = res.get_json()
+        if res.status_code == 202:
+            while data.get("status") != "done":
+                data = client.get(f"/chat/jobs/{data['job_id']}?wait=10").get_json()
+        return accepted, time.perf_counter() - started, data
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(one, range(clients)))
+    accepted = [r[0] * 1000 for r in results]
+    answered = [r[1] * 1000 for r in results]
+    ai_answers = sum(1 for r in results if not r[2].get("admin"))
+    print(f"{mode:>8} {statistics.median(accepted):>14.1f} {max(accepted):>12.1f} "
+          f"{statistics.median(answered):>13.1f} {ai_answers:>6}/{clients}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=2.0)
+    parser.add_argument("--clients", type=int, default=16)
+    args = parser.parse_args()
+
+    _server, state, url = start_stub(delay=args.delay)
+    os.environ["ENABLE_AI_CHAT"] = "1"
+    os.environ["AI_CHAT_URL"] = url
+    from common import load_app
+
+    app_module = load_app()
+    print(f"{'mode':>8} {'p50 accept ms':>14} {'max accept':>12} {'p50 answer ms':>13} {'AI ok':>8}")
+    for mode in ("sync", "offload"):
+        run(app_module, mode, args.clients)
+    print(f"upstream calls: {state.calls}")
+    sys.exit(0 if state.calls == 2 * args.clients else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Shared setup for the benchmark scripts.
+
+Every benchmark runs the real app module against a throwaway SQLite file so
+the committed if_fashion.db and the upload folders are never touched.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_app(db_path=None):
+    import app as app_module
+
+    workdir = tempfile.mkdtemp(prefix="if-fashion-bench-")
+    app_module.SQLITE_DB = db_path or os.path.join(workdir, "bench.db")
+    app_module.CUSTOMER_FOLDER = os.path.join(workdir, "customer_uploads")
+    app_module.EMPLOYEE_FOLDER = os.path.join(workdir, "employee_docs")
+    app_module.migrate_database()
+    return app_module
+
+
+def admin_client(app_module):
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess["admin"] = "bench"
+    return client
+
+
+def time_ms(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
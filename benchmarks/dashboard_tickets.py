@@ -0,0 +1,75 @@
+"""Admin dashboard latency versus number of open support tickets.
+
+Compares the old per-ticket message query (a new connection and one SELECT per
+thread) with the batched load_thread_messages() loader, and times the full
+/admin/dashboard render on top of the batched loader.
+
+    python benchmarks/dashboard_tickets.py --counts 10 100 300 1000
+"""
+
+import argparse
+import sqlite3
+from datetime import datetime
+
+from common import admin_client, load_app, time_ms
+
+
+def seed_tickets(app_module, count, messages_per_ticket):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with app_module.db_pool.connection() as conn:
+        conn.execute("DELETE FROM chat_messages")
+        conn.execute("DELETE FROM chat_threads")
+        conn.executemany(
+            "INSERT INTO chat_threads (id, status, category, created_at, updated_at) VALUES (?, 'open', 'general', ?, ?)",
+            [(f"t{i:06d}", now, now) for i in range(count)],
+        )
+        conn.executemany(
+            "INSERT INTO chat_messages (thread_id, sender, message, created_at) VALUES (?, ?, ?, ?)",
+            [
+                (f"t{i:06d}", "user" if j % 2 == 0 else "admin", f"message {j} on ticket {i}", now)
+                for i in range(count)
+                for j in range(messages_per_ticket)
+            ],
+        )
+        conn.commit()
+
+
+def legacy_loader(app_module, thread_ids):
+    grouped = {}
+    for thread_id in thread_ids:
+        with sqlite3.connect(app_module.SQLITE_DB) as conn:
+            conn.row_factory = sqlite3.Row
+            grouped[thread_id] = [
+                dict(row)
+                for row in conn.execute(
+                    "SELECT id, sender, message, created_at FROM chat_messages WHERE thread_id = ? ORDER BY id ASC",
+                    (thread_id,),
+                ).fetchall()
+            ]
+    return grouped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 300, 1000])
+    parser.add_argument("--messages", type=int, default=6, help="messages per ticket")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app_module = load_app()
+    client = admin_client(app_module)
+
+    print(f"{'tickets':>8} {'n+1 loader ms':>14} {'batched ms':>11} {'dashboard ms':>13}")
+    for count in args.counts:
+        seed_tickets(app_module, count, args.messages)
+        thread_ids = [f"t{i:06d}" for i in range(count)]
+        assert legacy_loader(app_module, thread_ids) == app_module.load_thread_messages(thread_ids)
+
+        before = time_ms(lambda: legacy_loader(app_module, thread_ids), args.repeat)
+        after = time_ms(lambda: app_module.load_thread_messages(thread_ids), args.repeat)
+        page = time_ms(lambda: client.get("/admin/dashboard"), args.repeat)
+        print(f"{count:>8} {before:>14.1f} {after:>11.1f} {page:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
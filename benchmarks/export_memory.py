@@ -0,0 +1,70 @@
+"""Peak Python memory of streamed reads versus materializing with fetch_all.
+
+Seeds N customer submissions, then measures tracemalloc peaks for the
+/admin/export CSV stream, for walking the table with iter_rows() in each row
+type, and for the fetch_all() list of dicts. Streamed peaks should stay flat
+as N grows.
+
+    python benchmarks/export_memory.py --rows 10000 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+
+from common import admin_client, load_app
+
+
+def seed(app_module, count):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with app_module.transaction() as conn:
+        conn.execute("DELETE FROM customer_submissions")
+        conn.executemany(
+            "INSERT INTO customer_submissions (track_id, name, phone, message, time, status) VALUES (?, ?, ?, ?, ?, 'pending')",
+            [(f"IF-000000-{i:06d}", f"Customer {i}", "9876543210", "x" * 120, now) for i in range(count)],
+        )
+
+
+def peak_kb(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024, elapsed
+
+
+def stream_export(client):
+    res = client.get("/admin/export/customers", buffered=False)
+    size = sum(len(chunk) for chunk in res.response)
+    res.close()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    app_module = load_app()
+    client = admin_client(app_module)
+    query = app_module.EXPORT_DATASETS["customers"][0]
+    readers = {
+        "export csv": lambda: stream_export(client),
+        "iter_rows dict": lambda: sum(1 for _ in app_module.iter_rows(query)),
+        "iter_rows namedtuple": lambda: sum(1 for _ in app_module.iter_rows(query, row_type="namedtuple")),
+        "iter_rows tuple": lambda: sum(1 for _ in app_module.iter_rows(query, row_type="tuple")),
+        "fetch_all": lambda: len(app_module.fetch_all(query)),
+    }
+    print(f"{'rows':>8} {'reader':>21} {'peak KB':>9} {'ms':>7}")
+    for count in args.rows:
+        seed(app_module, count)
+        for name, reader in readers.items():
+            peak, elapsed = peak_kb(reader)
+            print(f"{count:>8} {name:>21} {peak:>9.0f} {elapsed:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
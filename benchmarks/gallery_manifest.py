@@ -0,0 +1,71 @@
+"""GalleryManifest: cold/warm listing cost and srcset correctness.
+
+Writes N gallery JPEGs plus a phone-style photo stored landscape with EXIF
+Orientation=6, builds their variants, then times a cold manifest build and a
+warm entries() call. Checks that every advertised srcset file exists and that
+the rotated photo is listed portrait with its full-width variant. Needs
+Pillow; exits non-zero if a check fails.
+
+    python benchmarks/gallery_manifest.py --images 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from common import load_app, time_ms
+
+
+def write_jpeg(app_module, path, size, orientation=None):
+    image = app_module.Image.new("RGB", size, (180, 90, 60))
+    exif = app_module.Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(path, "JPEG", quality=85, exif=exif)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=200)
+    args = parser.parse_args()
+
+    app_module = load_app()
+    if app_module.Image is None:
+        sys.exit("Pillow is not installed.")
+    folder = tempfile.mkdtemp(prefix="if-fashion-gallery-")
+    for i in range(args.images):
+        write_jpeg(app_module, os.path.join(folder, f"design{i:04d}.jpg"), (800, 600))
+    write_jpeg(app_module, os.path.join(folder, "rotated.jpg"), (1600, 1200), orientation=6)
+    for name in os.listdir(folder):
+        app_module.build_image_variants(folder, name)
+
+    manifest = app_module.GalleryManifest(folder)
+    started = time.perf_counter()
+    entries = manifest.entries()
+    cold = (time.perf_counter() - started) * 1000
+    warm = time_ms(manifest.entries, repeat=20)
+    print(f"{'images':>7} {'cold ms':>8} {'warm ms':>8}")
+    print(f"{len(entries):>7} {cold:>8.1f} {warm:>8.3f}")
+
+    failures = []
+    for entry in entries:
+        for _width, path in entry["webp_srcset"] + entry["srcset"]:
+            if not os.path.exists(os.path.join(folder, path)):
+                failures.append(f"{entry['name']}: advertised {path} does not exist")
+    rotated = next(entry for entry in entries if entry["name"] == "rotated.jpg")
+    expected = app_module.variant_widths(1200) + [1200]
+    if (rotated["width"], rotated["height"]) != (1200, 1600):
+        failures.append(f"rotated.jpg listed as {rotated['width']}x{rotated['height']}, want 1200x1600")
+    if [w for w, _path in rotated["webp_srcset"]] != expected:
+        failures.append(f"rotated.jpg webp widths {[w for w, _ in rotated['webp_srcset']]}, want {expected}")
+    if [w for w, _path in rotated["srcset"]] != expected:
+        failures.append(f"rotated.jpg fallback widths {[w for w, _ in rotated['srcset']]}, want {expected}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
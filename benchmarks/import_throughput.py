@@ -0,0 +1,58 @@
+"""`flask import-data` throughput, first load versus an idempotent re-run.
+
+Writes synthetic JSONL dumps in the /admin/export format, imports them into
+a throwaway database twice (the second pass only upserts), and checks that
+the row counts did not change.
+
+    python benchmarks/import_throughput.py --customers 100000 --messages 200000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from common import load_app
+
+
+def write_dump(path, records):
+    with open(path, "w", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(record) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=100000)
+    parser.add_argument("--messages", type=int, default=200000)
+    args = parser.parse_args()
+
+    app_module = load_app()
+    workdir = tempfile.mkdtemp(prefix="if-fashion-import-")
+    customers = os.path.join(workdir, "customers.jsonl")
+    chats = os.path.join(workdir, "chats.jsonl")
+    write_dump(customers, (
+        {"id": i, "track_id": f"IF-240101-{i:05d}", "name": f"Customer {i}", "phone": "9876543210",
+         "image": "", "message": "imported", "time": "2024-01-01 10:00:00", "status": "pending"}
+        for i in range(1, args.customers + 1)
+    ))
+    write_dump(chats, (
+        {"id": i, "thread_id": f"t{i // 10:06d}", "thread_status": "closed", "category": "general",
+         "sender": "user" if i % 2 else "admin", "message": f"imported message {i}",
+         "created_at": "2024-01-01 10:00:00"}
+        for i in range(1, args.messages + 1)
+    ))
+
+    print(f"{'dataset':>10} {'pass':>6} {'records':>9} {'seconds':>8} {'records/s':>10}")
+    for dataset, path, table in (("customers", customers, "customer_submissions"), ("chats", chats, "chat_messages")):
+        counts = []
+        for label in ("first", "rerun"):
+            report = app_module.import_records(dataset, app_module.read_import_records(path, dataset))
+            assert report["rejected"] == 0, report["errors"]
+            counts.append(app_module.fetch_one(f"SELECT COUNT(*) AS c FROM {table}")["c"])
+            print(f"{dataset:>10} {label:>6} {report['imported']:>9} {report['seconds']:>8.2f} {report['per_second']:>10}")
+        assert counts[0] == counts[1], counts
+
+
+if __name__ == "__main__":
+    main()
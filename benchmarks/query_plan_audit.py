@@ -0,0 +1,314 @@
+"""Query-plan audit for every SQL statement the app runs.
+
+Seeds a throwaway database, then drives the public, chat and admin routes
+through the Flask test client plus the batch paths (chat jobs, exports,
+imports, maintenance jobs and the search-index rebuild). Each distinct
+statement is recorded via SQLite's trace hook and run through EXPLAIN QUERY
+PLAN. Exits non-zero if a statement does a full scan of a table that grows
+with traffic.
+
+A scan with no temp B-tree may be an ordered walk that stops at its LIMIT
+(keyset pages, "latest row" lookups). Those are re-run against the seeded
+tables, and pass only if they step through far fewer rows than the table
+holds. Batch jobs that read a whole table by design (an unfiltered export,
+the post-import track-ID sync, the FTS rebuild) may scan only the tables
+listed for them in JOB_PHASES.
+
+    python benchmarks/query_plan_audit.py [--verbose]
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Audit the shared SQLite limiter too; the in-memory one issues no SQL.
+os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+# Maintenance jobs are driven explicitly below, not from a background thread.
+os.environ.setdefault("MAINTENANCE_ENABLED", "0")
+
+from common import admin_client, load_app  # noqa: E402
+
+# Small, bounded tables where a scan is the cheapest plan.
+SCAN_ALLOWED = {"admins", "dashboard_counters", "schema_version", "track_id_sequences"}
+SKIP_PREFIXES = ("PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "CREATE", "ALTER", "ANALYZE", "VACUUM", "--")
+# FTS5 maintains its own shadow tables with internal statements of this form.
+FTS5_INTERNAL = re.compile(r"'main'\.'\w+_(config|content|data|docsize|idx)'")
+# Filler rows per growing table; a bounded walk must finish in far fewer
+# VM steps than a pass over this many rows.
+PROBE_ROWS = 5000
+PROBE_STEP_LIMIT = PROBE_ROWS
+SQL_KEYWORDS = {"WHERE", "JOIN", "LEFT", "INNER", "CROSS", "ON", "ORDER", "GROUP", "LIMIT", "USING", "SET", "VALUES", "UNION"}
+
+
+def seed(app_module):
+    now = int(time.time())
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    with app_module.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO customer_submissions (track_id, name, phone, image, message, time, status) VALUES (?, ?, ?, ?, ?, ?, 'pending')",
+            [(f"IF-200101-{i:05d}", f"Filler {i}", "9876543210", f"f{i}.png", "filler", stamp[:16]) for i in range(PROBE_ROWS)],
+        )
+        conn.executemany(
+            "INSERT INTO employee_requests (track_id, name, phone, aadhar, message, time, status) VALUES (?, ?, ?, '', 'filler', ?, 'pending')",
+            [(f"EMP-200101-{i:05d}", f"Filler {i}", "9876543210", stamp[:16]) for i in range(PROBE_ROWS)],
+        )
+        conn.executemany(
+            "INSERT INTO chat_threads (id, status, category, created_at, updated_at) VALUES (?, 'closed', 'general', ?, ?)",
+            [(f"filler{i}", stamp, stamp) for i in range(PROBE_ROWS)],
+        )
+        conn.executemany(
+            "INSERT INTO chat_messages (thread_id, sender, message, created_at) VALUES (?, 'user', 'filler', ?)",
+            [(f"filler{i}", stamp) for i in range(PROBE_ROWS)],
+        )
+        conn.executemany(
+            "INSERT INTO chat_jobs (id, status, created_at) VALUES (?, 'done', ?)",
+            [(f"filler{i}", now) for i in range(PROBE_ROWS)],
+        )
+        conn.executemany(
+            "INSERT INTO rate_limit_counters (ip, endpoint, window_start, hits, expires_at) VALUES (?, 'filler', ?, 1, ?)",
+            [(f"10.0.{i // 256}.{i % 256}", now, now + 3600) for i in range(PROBE_ROWS)],
+        )
+        conn.executemany(
+            "INSERT INTO request_limits (ip, endpoint, created_at) VALUES ('10.0.0.1', 'filler', ?)",
+            [(now,) for _ in range(PROBE_ROWS)],
+        )
+        # One thread old enough for archive_closed_threads to move.
+        conn.execute(
+            "INSERT INTO chat_threads (id, status, category, created_at, updated_at) VALUES ('old', 'closed', 'general', '2000-01-01 00:00:00', '2000-01-01 00:00:00')"
+        )
+        conn.execute("INSERT INTO chat_messages (thread_id, sender, message, created_at) VALUES ('old', 'user', 'archived', '2000-01-01 00:00:00')")
+
+
+def latest_row(app_module, table):
+    with sqlite3.connect(app_module.SQLITE_DB) as conn:
+        return conn.execute(f"SELECT id, track_id FROM {table} ORDER BY id DESC LIMIT 1").fetchone()
+
+
+def drive_routes(app_module):
+    client = app_module.app.test_client()
+    client.get("/")
+    client.get("/designs")
+    client.post(
+        "/customer_contact",
+        data={"name": "Audit", "phone": "9876543210", "message": "plan", "image": (io.BytesIO(b"x"), "a.png")},
+        content_type="multipart/form-data",
+    )
+    client.post("/careers", data={"name": "Audit", "phone": "9876543210", "aadhar": "234123412346"})
+    ticket_id = client.post("/chat/ticket", json={"message": "query plan audit"}).get_json()["ticket_id"]
+    client.post("/chat/ticket/message", json={"ticket_id": ticket_id, "message": "follow up"})
+    client.get(f"/chat/ticket/{ticket_id}/messages?after_id=0")
+    client.get(f"/chat/check/{ticket_id}")
+
+    customer_id, customer_track_id = latest_row(app_module, "customer_submissions")
+    employee_id, employee_track_id = latest_row(app_module, "employee_requests")
+    client.post("/track", data={"track_id": customer_track_id})
+    client.post("/track", data={"track_id": employee_track_id})
+    client.get(f"/track/{customer_track_id}/status")
+
+    admin = admin_client(app_module)
+    admin.get("/admin/dashboard")
+    admin.get("/admin/dashboard?cust_status=pending&cust_before=100&emp_after=1")
+    admin.get("/admin/dashboard?cust_from=2020-01-01&cust_to=2030-01-01")
+    admin.get("/admin/stats")
+    admin.get("/admin/search?q=audit+plan")
+    admin.post("/admin/chat/reply", data={"id": ticket_id, "reply": "audit reply"})
+    admin.post(f"/admin/customer/status/{customer_id}/approved")
+    admin.post(f"/admin/employee/status/{employee_id}/approved")
+    admin.post(f"/admin/employee/note/{employee_id}", data={"salary_model": "x", "admin_note": "y"})
+    admin.post(f"/admin/chat/close/{ticket_id}")
+    admin.post("/admin/bulk", json={"target": "emp", "action": "pending", "ids": [employee_id]})
+    admin.post(f"/admin/customer/delete/{customer_id}")
+    client.post(
+        "/customer_contact",
+        data={"name": "Audit", "phone": "9876543210", "message": "bulk", "image": (io.BytesIO(b"x"), "a.png")},
+        content_type="multipart/form-data",
+    )
+    bulk_id, _track_id = latest_row(app_module, "customer_submissions")
+    admin.post("/admin/bulk", json={"target": "cust", "action": "delete", "ids": [bulk_id]})
+
+
+def drive_chat_jobs(app_module):
+    # AI chat is off by default; fail the upstream so jobs take the fallback.
+    def unavailable(*_args, **_kwargs):
+        raise app_module.AIUnavailable("audit")
+
+    original = app_module.ask_ai_assistant
+    app_module.ask_ai_assistant = unavailable
+    try:
+        client = app_module.app.test_client()
+        for _ in range(2):
+            job_id = app_module.submit_chat_job("audit question", "audit-client")
+            client.get(f"/chat/jobs/{job_id}?wait=5")
+    finally:
+        app_module.ask_ai_assistant = original
+
+
+def drive_exports(app_module):
+    admin = admin_client(app_module)
+    for dataset in app_module.EXPORT_DATASETS:
+        admin.get(f"/admin/export/{dataset}").get_data()
+        admin.get(f"/admin/export/{dataset}?format=jsonl&status=closed&from=2020-01-01&to=2030-01-01").get_data()
+        admin.get(f"/admin/export/{dataset}?status=pending").get_data()
+        admin.get(f"/admin/export/{dataset}?from=2020-01-01").get_data()
+
+
+def drive_imports(app_module):
+    stamp = "2024-01-01 10:00:00"
+    records = {
+        "customers": [{"id": 900001, "track_id": "IF-240101-0001", "name": "Imported", "status": "pending"}],
+        "employees": [{"id": 900001, "track_id": "EMP-240101-0001", "name": "Imported", "status": "pending"}],
+        "chats": [{"id": 900001, "thread_id": "imported", "thread_status": "closed", "sender": "user",
+                   "message": "imported", "created_at": stamp}],
+        "threads": [{"id": "imported2", "status": "closed", "created_at": stamp, "updated_at": stamp,
+                     "messages": [{"id": 900002, "sender": "admin", "message": "imported", "created_at": stamp}]}],
+    }
+    for dataset, rows in records.items():
+        app_module.import_records(dataset, ((f"line {i}", row) for i, row in enumerate(rows, 1)))
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fh:
+        json.dump({"pending": [{"id": "legacy1", "question": "q"}],
+                   "answered": [{"id": "legacy2", "question": "q", "reply": "r"}]}, fh)
+    app_module.import_records("legacy-chat", app_module.read_import_records(fh.name, "legacy-chat"))
+    os.unlink(fh.name)
+
+
+def drive_maintenance(app_module):
+    app_module.CHAT_ARCHIVE_DIR = tempfile.mkdtemp(prefix="if-fashion-audit-archive-")
+    app_module.MAINTENANCE_BATCH_SIZE = 50
+    app_module.maintenance.run_due()
+    admin_client(app_module).get("/admin/maintenance")
+
+
+def drive_search_rebuild(app_module):
+    with app_module.transaction() as conn:
+        if app_module.fts5_available(conn):
+            app_module.create_search_index(conn, rebuild=True)
+
+
+# (phase, driver, growing tables it may scan end to end by design)
+JOB_PHASES = (
+    ("routes", drive_routes, set()),
+    ("chat jobs", drive_chat_jobs, set()),
+    # An export streams every matching row in id order; for the usual wide
+    # filters (a month, all closed chats) that walk beats an index plus sort.
+    ("exports", drive_exports, {"customer_submissions", "employee_requests", "chat_messages"}),
+    # sync_track_id_sequences groups every track ID once per import run.
+    ("imports", drive_imports, {"customer_submissions", "employee_requests"}),
+    ("maintenance", drive_maintenance, set()),
+    ("search rebuild", drive_search_rebuild, {"customer_submissions", "employee_requests", "chat_messages"}),
+)
+
+
+def capture_statements(app_module):
+    # sql -> tables its phases may scan (the intersection over every phase
+    # that issued it, so a route cannot borrow a batch job's allowance).
+    statements = {}
+    original = app_module.get_db_connection
+    current = {}
+
+    def record(sql):
+        sql = " ".join(sql.split())
+        allowed = statements.get(sql)
+        statements[sql] = current["allowed"] if allowed is None else allowed & current["allowed"]
+
+    def traced_connection():
+        conn = original()
+        conn.set_trace_callback(record)
+        return conn
+
+    for _phase, drive, allowed in JOB_PHASES:
+        app_module.db_pool.close_all()
+        app_module.get_db_connection = traced_connection
+        current["allowed"] = frozenset(allowed)
+        try:
+            drive(app_module)
+        finally:
+            app_module.get_db_connection = original
+            app_module.db_pool.close_all()
+    return {
+        sql: allowed for sql, allowed in statements.items()
+        if not sql.upper().startswith(SKIP_PREFIXES) and not FTS5_INTERNAL.search(sql)
+    }
+
+
+def vm_steps(conn, sql):
+    # Runs the statement to completion inside a savepoint that is rolled back
+    # and counts virtual-machine steps in units of 10.
+    steps = [0]
+
+    def tick():
+        steps[0] += 10
+        return 0
+
+    conn.execute("SAVEPOINT audit_probe")
+    conn.set_progress_handler(tick, 10)
+    try:
+        for _row in conn.execute(sql):
+            pass
+    finally:
+        conn.set_progress_handler(None, 0)
+        conn.execute("ROLLBACK TO audit_probe")
+        conn.execute("RELEASE audit_probe")
+    return steps[0]
+
+
+def table_aliases(sql):
+    # EXPLAIN QUERY PLAN names tables by alias ("SCAN m"); map them back.
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql, plan, allowed):
+    aliases = table_aliases(sql)
+    scans = []
+    for detail in plan:
+        match = re.match(r"SCAN (\w+)", detail)
+        if not match:
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        if table not in SCAN_ALLOWED and table not in allowed:
+            scans.append(detail)
+    if scans and not any("TEMP B-TREE" in detail for detail in plan):
+        # An ordered walk (no sort step) may still stop early; judge it by
+        # how far it actually gets through the seeded tables.
+        if vm_steps(conn, sql) < PROBE_STEP_LIMIT:
+            return []
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    app_module = load_app()
+    seed(app_module)
+    statements = capture_statements(app_module)
+
+    failures = []
+    with app_module.db_pool.connection() as conn:
+        for sql, allowed in statements.items():
+            plan = [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            scans = full_scans(conn, sql, plan, allowed)
+            if scans:
+                failures.append((sql, plan))
+            if args.verbose or scans:
+                print(("FULL SCAN  " if scans else "ok         ") + sql[:140])
+                for detail in plan:
+                    print(f"           {detail}")
+
+    print(f"{len(statements)} distinct statements audited, {len(failures)} with full table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""Route-level load test: p50/p95/p99 latency and throughput, gated on baselines.
+
+Seeds a throwaway database at production-like volumes, then drives every
+public route and the admin dashboard two ways:
+
+  client  in-process through the Flask test client, one request at a time
+          (app and SQLite cost only)
+  http    against a local gunicorn from several client processes (adds the
+          WSGI server, sockets and contention between workers)
+
+Each form POST sends a distinct X-Forwarded-For so the per-IP rate limits do
+not turn the run into a 429 benchmark, and write routes are checked against
+the row counts afterwards. Results are compared with benchmarks/baselines.json;
+a route whose p95 or throughput regressed past --tolerance, or that returned
+errors, fails the run with exit code 1.
+
+    python benchmarks/route_latency.py
+    python benchmarks/route_latency.py --scale 0.1 --driver client
+    python benchmarks/route_latency.py --save-baseline
+
+Baselines are machine-specific: record them on the machine that runs the gate,
+with the same seed volumes.
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+
+from werkzeug.security import generate_password_hash
+
+from common import ROOT, admin_client, load_app
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+ADMIN_USER = "loadtest"
+ADMIN_PASSWORD = "loadtest-password"
+MESSAGES_PER_THREAD = 20
+SAMPLE_IDS = 2000
+REFERENCE_IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(2048)
+WORDS = (
+    "blouse lehenga kurti saree stitching fitting delivery alteration payment refund "
+    "embroidery lining sleeve neckline measurement pickup courier fabric colour size"
+).split()
+
+
+# ---------------- SEED ----------------
+
+def seed(app_module, customers, employees, messages, open_tickets):
+    rng = random.Random(11)
+    threads = max(1, messages // MESSAGES_PER_THREAD)
+    stamp = "2024-01-01 10:00:00"
+    with app_module.transaction() as conn:
+        conn.execute(
+            "INSERT INTO admins (username, password) VALUES (?, ?)",
+            (ADMIN_USER, generate_password_hash(ADMIN_PASSWORD)),
+        )
+        conn.executemany(
+            "INSERT INTO customer_submissions (track_id, name, phone, image, message, time, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (f"IF-240101-{i:06d}", f"Customer {i}", "9876543210", f"ref_{i}.png",
+                 " ".join(rng.choices(WORDS, k=16)), stamp[:16], rng.choice(app_module.REVIEW_STATUSES))
+                for i in range(1, customers + 1)
+            ),
+        )
+        conn.executemany(
+            """
+            INSERT INTO employee_requests (track_id, name, phone, aadhar, aadhar_file, work_type, experience, message, status, time)
+            VALUES (?, ?, ?, '234567890123', '', 'tailoring', '3 years', ?, ?, ?)
+            """,
+            (
+                (f"EMP-240101-{i:06d}", f"Applicant {i}", "9876543210",
+                 " ".join(rng.choices(WORDS, k=12)), rng.choice(app_module.REVIEW_STATUSES), stamp[:16])
+                for i in range(1, employees + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO chat_threads (id, status, category, created_at, updated_at) VALUES (?, ?, 'general', ?, ?)",
+            ((f"t{i:07d}", "open" if i >= threads - open_tickets else "closed", stamp, stamp) for i in range(threads)),
+        )
+        conn.executemany(
+            "INSERT INTO chat_messages (thread_id, sender, message, created_at) VALUES (?, ?, ?, ?)",
+            (
+                (f"t{i // MESSAGES_PER_THREAD:07d}", "user" if i % 2 == 0 else "admin",
+                 " ".join(rng.choices(WORDS, k=12)), stamp)
+                for i in range(threads * MESSAGES_PER_THREAD)
+            ),
+        )
+        app_module.sync_track_id_sequences(conn)
+
+    sample = rng.sample(range(1, customers + 1), min(SAMPLE_IDS, customers))
+    return {
+        "track_ids": [f"IF-240101-{i:06d}" for i in sample]
+        + [f"EMP-240101-{i:06d}" for i in sample if i <= employees],
+        "open_tickets": [f"t{i:07d}" for i in range(max(0, threads - open_tickets), threads)],
+        "aadhaar": next(n for n in (f"23456789012{d}" for d in range(10)) if app_module.is_valid_aadhaar(n)),
+    }
+
+
+# ---------------- SCENARIOS ----------------
+
+# Each scenario maps (context, request number) to one request. Reads run before
+# writes so the dashboard does not see tickets opened by the chat scenarios.
+def home(ctx, n):
+    return {"method": "GET", "path": "/"}
+
+
+def designs(ctx, n):
+    return {"method": "GET", "path": "/designs"}
+
+
+def track_post(ctx, n):
+    return {"method": "POST", "path": "/track", "form": {"track_id": ctx["track_ids"][n % len(ctx["track_ids"])]}}
+
+
+def track_status(ctx, n):
+    return {"method": "GET", "path": f"/track/{ctx['track_ids'][n % len(ctx['track_ids'])]}/status"}
+
+
+def ticket_messages(ctx, n):
+    return {"method": "GET", "path": f"/chat/ticket/{ctx['open_tickets'][n % len(ctx['open_tickets'])]}/messages"}
+
+
+def admin_dashboard(ctx, n):
+    return {"method": "GET", "path": "/admin/dashboard", "admin": True}
+
+
+def customer_contact_post(ctx, n):
+    return {
+        "method": "POST",
+        "path": "/customer_contact",
+        "form": {"name": "Load Test", "phone": "9876543210", "message": "Need this motif on a kurti yoke."},
+        "files": {"image": ("reference.png", REFERENCE_IMAGE)},
+    }
+
+
+def careers_post(ctx, n):
+    return {
+        "method": "POST",
+        "path": "/careers",
+        "form": {"name": "Load Test", "phone": "9876543210", "aadhar": ctx["aadhaar"],
+                 "work_type": "embroidery", "experience": "2 years", "message": "Available weekdays."},
+    }
+
+
+def ticket_post(ctx, n):
+    return {"method": "POST", "path": "/chat/ticket", "json": {"message": f"Where is my order? ref {n}"}}
+
+
+def ticket_message_post(ctx, n):
+    return {
+        "method": "POST",
+        "path": "/chat/ticket/message",
+        "json": {"ticket_id": ctx["open_tickets"][n % len(ctx["open_tickets"])], "message": f"Any update? {n}"},
+    }
+
+
+# name -> (request builder, expected status, table that gains one row per request)
+SCENARIOS = {
+    "GET /": (home, 200, None),
+    "GET /designs": (designs, 200, None),
+    "POST /track": (track_post, 200, None),
+    "GET /track/<id>/status": (track_status, 200, None),
+    "GET /chat/ticket/<id>/messages": (ticket_messages, 200, None),
+    "GET /admin/dashboard": (admin_dashboard, 200, None),
+    "POST /customer_contact": (customer_contact_post, 302, "customer_submissions"),
+    "POST /careers": (careers_post, 302, "employee_requests"),
+    "POST /chat/ticket": (ticket_post, 200, "chat_threads"),
+    "POST /chat/ticket/message": (ticket_message_post, 200, "chat_messages"),
+}
+
+
+def client_ip(n):
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def summarize(latencies, errors, seconds):
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / seconds, 1),
+        "p50": round(cuts[49], 2),
+        "p95": round(cuts[94], 2),
+        "p99": round(cuts[98], 2),
+    }
+
+
+def last_rowid(app_module, table):
+    return app_module.fetch_one(f"SELECT MAX(rowid) AS r FROM {table}")["r"] or 0
+
+
+def run_scenario(app_module, name, driver, total, warmup):
+    _build, _expected, table = SCENARIOS[name]
+    before = last_rowid(app_module, table) if table else 0
+    latencies, errors, seconds = driver(name, total, warmup)
+    if table:
+        # Redirects look the same on success and on a validation error, so
+        # count the rows that actually landed.
+        errors = max(errors, total + warmup - (last_rowid(app_module, table) - before))
+    return summarize(latencies, errors, seconds)
+
+
+# ---------------- CLIENT DRIVER ----------------
+
+def client_driver(app_module, ctx):
+    clients = {False: app_module.app.test_client(), True: admin_client(app_module)}
+
+    def drive(name, total, warmup):
+        build, expected, _table = SCENARIOS[name]
+        latencies, errors = [], 0
+        started = None
+        for n in range(warmup + total):
+            if n == warmup:
+                started = time.perf_counter()
+            spec = build(ctx, n)
+            data = dict(spec.get("form") or {})
+            for field, (filename, content) in (spec.get("files") or {}).items():
+                data[field] = (io.BytesIO(content), filename)
+            t0 = time.perf_counter()
+            res = clients[spec.get("admin", False)].open(
+                spec["path"], method=spec["method"], data=data or None, json=spec.get("json"),
+                headers={"X-Forwarded-For": client_ip(n)},
+            )
+            res.get_data()
+            if n >= warmup:
+                latencies.append((time.perf_counter() - t0) * 1000)
+                errors += res.status_code != expected
+        return latencies, errors, time.perf_counter() - started
+
+    return drive
+
+
+# ---------------- HTTP DRIVER ----------------
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = None
+_base_url = None
+_ctx = None
+
+
+def http_worker_init(base_url, ctx):
+    global _opener, _base_url, _ctx
+    _base_url = base_url
+    _ctx = ctx
+    _opener = urllib.request.build_opener(NoRedirect, urllib.request.HTTPCookieProcessor(CookieJar()))
+    http_send({"method": "POST", "path": "/admin", "form": {"username": ADMIN_USER, "password": ADMIN_PASSWORD}}, 0)
+
+
+def encode_body(spec):
+    if spec.get("json") is not None:
+        return json.dumps(spec["json"]).encode(), "application/json"
+    if spec.get("files"):
+        boundary = uuid.uuid4().hex
+        parts = [
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"\r\n\r\n{value}\r\n'.encode()
+            for field, value in spec["form"].items()
+        ]
+        for field, (filename, content) in spec["files"].items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                f"Content-Type: application/octet-stream\r\n\r\n".encode() + content + b"\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n".encode())
+        return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+    if spec.get("form"):
+        return urlencode(spec["form"]).encode(), "application/x-www-form-urlencoded"
+    return None, None
+
+
+def http_send(spec, n):
+    body, content_type = encode_body(spec)
+    req = urllib.request.Request(_base_url + spec["path"], data=body, method=spec["method"])
+    req.add_header("X-Forwarded-For", client_ip(n))
+    if content_type:
+        req.add_header("Content-Type", content_type)
+    try:
+        with _opener.open(req, timeout=60) as res:
+            res.read()
+            return res.status
+    except urllib.error.HTTPError as exc:
+        exc.read()
+        return exc.code
+
+
+def http_chunk(task):
+    name, first, count = task
+    build, expected, _table = SCENARIOS[name]
+    latencies, errors = [], 0
+    for n in range(first, first + count):
+        t0 = time.perf_counter()
+        status = http_send(build(_ctx, n), n)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        errors += status != expected
+    return latencies, errors
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(app_module, workers, threads):
+    port = free_port()
+    env = dict(
+        os.environ,
+        SQLITE_DB=app_module.SQLITE_DB,
+        CUSTOMER_FOLDER=app_module.CUSTOMER_FOLDER,
+        EMPLOYEE_FOLDER=app_module.EMPLOYEE_FOLDER,
+        MAINTENANCE_ENABLED="0",
+        FLASK_SECRET_KEY="route-latency",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "--bind", f"127.0.0.1:{port}",
+         "--workers", str(workers), "--worker-class", "gthread", "--threads", str(threads),
+         "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while True:
+        try:
+            urllib.request.urlopen(base_url + "/health", timeout=2).read()
+            return server, base_url
+        except OSError:
+            if server.poll() is not None or time.time() > deadline:
+                server.kill()
+                raise SystemExit("gunicorn did not start; is it installed (pip install -r requirements.txt)?")
+            time.sleep(0.2)
+
+
+def split(name, first, total, processes):
+    tasks = []
+    for p in range(processes):
+        count = total // processes + (p < total % processes)
+        tasks.append((name, first, count))
+        first += count
+    return tasks
+
+
+def http_driver(pool, processes):
+    def drive(name, total, warmup):
+        # Request numbers start past the client run's so every POST still
+        # comes from an IP the rate limiter has not seen.
+        first = 1 << 20
+        pool.map(http_chunk, split(name, first, warmup, processes))
+        started = time.perf_counter()
+        chunks = pool.map(http_chunk, split(name, first + warmup, total, processes))
+        seconds = time.perf_counter() - started
+        latencies = [ms for chunk, _errors in chunks for ms in chunk]
+        return latencies, sum(errors for _chunk, errors in chunks), seconds
+
+    return drive
+
+
+# ---------------- BASELINES ----------------
+
+def compare(results, baseline, tolerance, slack_ms):
+    failures = []
+    for driver, routes in results.items():
+        for name, now in routes.items():
+            if now["errors"]:
+                failures.append(f"{driver} {name}: {now['errors']} errors")
+            base = baseline.get(driver, {}).get(name)
+            if not base:
+                continue
+            if now["p95"] > base["p95"] * (1 + tolerance) + slack_ms:
+                failures.append(f"{driver} {name}: p95 {now['p95']} ms vs baseline {base['p95']} ms")
+            # Throughput is compared as wall-clock ms per request so the same
+            # slack covers sub-millisecond routes.
+            if 1000 / now["rps"] > 1000 / base["rps"] * (1 + tolerance) + slack_ms:
+                failures.append(f"{driver} {name}: {now['rps']} req/s vs baseline {base['rps']} req/s")
+    return failures
+
+
+def print_table(driver, routes):
+    print(f"\n{driver} driver")
+    print(f"{'route':>30} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, r in routes.items():
+        print(f"{name:>30} {r['requests']:>6} {r['errors']:>4} {r['rps']:>8} {r['p50']:>8} {r['p95']:>8} {r['p99']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=100000)
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--messages", type=int, default=1000000)
+    parser.add_argument("--open-tickets", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the seed volumes")
+    parser.add_argument("--driver", choices=("client", "http", "both"), default="both")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=4, help="HTTP client processes")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed p95/throughput regression")
+    parser.add_argument("--slack-ms", type=float, default=2.0, help="absolute slack for sub-ms routes")
+    args = parser.parse_args()
+
+    volumes = {
+        "customers": int(args.customers * args.scale),
+        "employees": int(args.employees * args.scale),
+        "messages": int(args.messages * args.scale),
+        "open_tickets": args.open_tickets,
+    }
+    os.environ["MAINTENANCE_ENABLED"] = "0"
+    app_module = load_app()
+    started = time.perf_counter()
+    ctx = seed(app_module, **volumes)
+    print(f"seeded {volumes} in {time.perf_counter() - started:.1f}s")
+
+    results = {}
+    if args.driver in ("client", "both"):
+        drive = client_driver(app_module, ctx)
+        results["client"] = {name: run_scenario(app_module, name, drive, args.requests, args.warmup) for name in SCENARIOS}
+        print_table("client", results["client"])
+    if args.driver in ("http", "both"):
+        server, base_url = start_gunicorn(app_module, args.workers, args.threads)
+        try:
+            with multiprocessing.Pool(args.processes, http_worker_init, (base_url, ctx)) as pool:
+                drive = http_driver(pool, args.processes)
+                results["http"] = {
+                    name: run_scenario(app_module, name, drive, args.requests, args.warmup)
+                    for name in SCENARIOS
+                }
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        print_table(f"http ({args.processes} clients, {args.workers}x{args.threads} gunicorn)", results["http"])
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    if baseline and baseline.get("seed") != volumes:
+        print(f"\nbaseline was recorded with seed {baseline.get('seed')}; not comparing")
+        baseline = {}
+
+    if args.save_baseline:
+        saved = {"seed": volumes, "results": {**baseline.get("results", {}), **results}}
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(saved, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"\nbaseline written to {args.baseline}")
+        sys.exit(0)
+
+    failures = compare(results, baseline.get("results", {}), args.tolerance, args.slack_ms)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    print(f"\n{len(failures)} regressions (tolerance {args.tolerance:.0%}, slack {args.slack_ms} ms)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""/admin/search latency over a large chat history, FTS5 versus LIKE.
+
+Seeds a throwaway database with synthetic chat messages (indexed through the
+same triggers the app uses), then times ranked prefix searches through the
+endpoint and the equivalent `LIKE '%term%'` scan it replaces.
+
+    python benchmarks/search_latency.py --messages 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from common import admin_client, load_app, time_ms
+
+WORDS = (
+    "blouse lehenga kurti saree stitching fitting delivery alteration payment refund "
+    "embroidery lining sleeve neckline measurement pickup courier fabric colour size"
+).split()
+RARE = ("zardozi", "mirrorwork", "bandhani")
+
+
+def seed(app_module, total):
+    rng = random.Random(7)
+    started = time.perf_counter()
+    with app_module.transaction() as conn:
+        for batch_start in range(0, total, 10000):
+            rows = []
+            for i in range(batch_start, min(batch_start + 10000, total)):
+                words = rng.choices(WORDS, k=12)
+                if i % 5000 == 0:
+                    words.append(RARE[i // 5000 % len(RARE)])
+                rows.append((f"t{i // 20:07d}", "user", " ".join(words), "2024-01-01 10:00:00"))
+            conn.executemany(
+                "INSERT INTO chat_messages (thread_id, sender, message, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000000)
+    args = parser.parse_args()
+
+    app_module = load_app()
+    seconds = seed(app_module, args.messages)
+    print(f"seeded {args.messages} messages in {seconds:.1f}s ({args.messages / seconds:,.0f} rows/s)")
+    client = admin_client(app_module)
+
+    print(f"{'query':>14} {'fts ms':>9} {'hits':>5} {'like ms':>9}")
+    for term in ("zardozi", "mirror", "embroid", "blouse fit"):
+        url = f"/admin/search?scope=chat&q={term.replace(' ', '+')}"
+        hits = len(client.get(url).get_json()["results"]["chat"])
+        fts = time_ms(lambda: client.get(url))
+        like = time_ms(
+            lambda: app_module.fetch_all(
+                "SELECT id FROM chat_messages WHERE message LIKE ? LIMIT 20", (f"%{term.split()[0]}%",)
+            ),
+            repeat=3,
+        )
+        print(f"{term:>14} {fts:>9.2f} {hits:>5} {like:>9.2f}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Concurrency stress test for the track-ID allocator.
+
+Several processes share one SQLite file and insert customer submissions as
+fast as they can through insert_with_track_id(). The run fails if any ID is
+issued twice, any insert is lost, or the sequence has gaps.
+
+    python benchmarks/track_id_stress.py --processes 8 --inserts 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from common import load_app
+
+
+def worker(db_path, inserts, start_barrier, results):
+    app_module = load_app(db_path)
+    start_barrier.wait()
+    issued = []
+    for i in range(inserts):
+        issued.append(
+            app_module.insert_with_track_id(
+                "IF",
+                ("name", "phone", "image", "message", "time", "status"),
+                (f"stress {os.getpid()} {i}", "9876543210", "", "", "", "pending"),
+            )
+        )
+    results.put(issued)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--inserts", type=int, default=200, help="inserts per process")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="if-fashion-stress-"), "stress.db")
+    load_app(db_path)
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(args.processes)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(db_path, args.inserts, barrier, results))
+        for _ in range(args.processes)
+    ]
+    started = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    issued = [track_id for _ in procs for track_id in results.get()]
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - started
+
+    expected = args.processes * args.inserts
+    sequences = sorted(int(track_id.rsplit("-", 1)[1]) for track_id in issued)
+    failures = []
+    if any(proc.exitcode != 0 for proc in procs):
+        failures.append("a worker process crashed")
+    if len(issued) != expected:
+        failures.append(f"expected {expected} IDs, got {len(issued)}")
+    if len(set(issued)) != len(issued):
+        failures.append(f"{len(issued) - len(set(issued))} duplicate IDs")
+    if sequences != list(range(1, len(sequences) + 1)):
+        failures.append("sequence has gaps")
+
+    print(f"{len(issued)} inserts from {args.processes} processes in {elapsed:.2f}s "
+          f"({len(issued) / elapsed:.0f}/s)")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK: all track IDs unique and contiguous")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ let activeCategory = "";
 let activeTicketId = "";
 let lastSeenMessageId = 0;
 const ticketPollers = new Map();
+const LONG_POLL_WAIT = 25;
+const POLL_FALLBACK_MS = 10000;
 
 function scrollToBottom() {
     messages.scrollTop = messages.scrollHeight;
@@ -160,38 +162,56 @@ async function createSupportTicket(issueText) {
     }
 }
 
+function stopTicketPolling(ticketId) {
+    const poller = ticketPollers.get(ticketId);
+    if (poller) poller.active = false;
+    ticketPollers.delete(ticketId);
+}
+
 function startTicketPolling(ticketId) {
     if (!ticketId || ticketPollers.has(ticketId)) return;
 
-    const poller = setInterval(async () => {
-        try {
-            const res = await fetch(`/chat/ticket/${ticketId}/messages?after_id=${lastSeenMessageId}`);
-            const data = await res.json();
-            if (!res.ok) return;
-
-            if (Array.isArray(data.messages) && data.messages.length > 0) {
-                data.messages.forEach((msg) => {
-                    lastSeenMessageId = Math.max(lastSeenMessageId, Number(msg.id) || 0);
-                    if (msg.sender === "admin") {
-                        addBot(`Support Team (${ticketId}): ${msg.message}`);
+    // Long-poll: the server holds the request until a reply arrives (or
+    // LONG_POLL_WAIT passes). Falls back to plain 10s polling when the server
+    // answers without waiting or the request fails.
+    const poller = { active: true };
+    ticketPollers.set(ticketId, poller);
+
+    (async () => {
+        while (poller.active) {
+            let waited = false;
+            try {
+                const res = await fetch(`/chat/ticket/${ticketId}/messages?after_id=${lastSeenMessageId}&wait=${LONG_POLL_WAIT}`);
+                const data = await res.json();
+                if (!poller.active) break;
+
+                if (res.ok) {
+                    waited = Boolean(data.long_poll);
+                    if (Array.isArray(data.messages) && data.messages.length > 0) {
+                        waited = true;
+                        data.messages.forEach((msg) => {
+                            lastSeenMessageId = Math.max(lastSeenMessageId, Number(msg.id) || 0);
+                            if (msg.sender === "admin") {
+                                addBot(`Support Team (${ticketId}): ${msg.message}`);
+                            }
+                        });
                     }
-                });
-            }
 
-            if (data.status === "closed") {
-                addBot(`Ticket ${ticketId} has been closed. If you need more help, choose support again to open a fresh conversation.`);
-                clearInterval(poller);
-                ticketPollers.delete(ticketId);
-                if (activeTicketId === ticketId) {
-                    activeTicketId = "";
+                    if (data.status === "closed") {
+                        addBot(`Ticket ${ticketId} has been closed. If you need more help, choose support again to open a fresh conversation.`);
+                        stopTicketPolling(ticketId);
+                        if (activeTicketId === ticketId) {
+                            activeTicketId = "";
+                        }
+                        break;
+                    }
                 }
+            } catch (_err) {
+                // Silent retry.
             }
-        } catch (_err) {
-            // Silent retry.
+            if (!waited) await sleep(POLL_FALLBACK_MS);
         }
-    }, 10000);
-
-    ticketPollers.set(ticketId, poller);
+    })();
 }
 
 async function sendMessageToTicket(ticketId, message) {